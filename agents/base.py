@@ -11,7 +11,8 @@ class BaseAgent:
 
     Previously this carried a LangChain LLM instance. We now call Gemini
     directly via `core.gemini_client`, so this class is intentionally minimal.
+    Empty `__slots__` lets subclasses that declare their own slots stay dict-free.
     """
 
-    pass
+    __slots__ = ()
 
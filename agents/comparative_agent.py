@@ -11,14 +11,52 @@ This agent:
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-import json
+import os
+import pickle
+import re
+from string import Template
 from typing import Any, Iterable, List
 
+import numpy as np
+import orjson
+
 from agents.base import BaseAgent
 from core.config import get_settings
-from core.gemini_client import generate_json
+from core.gemini_client import generate_json, generate_json_async
+from rag.hashing import HashingEmbedder
+
+
+_MONEY_RE = re.compile(r"\$?[\d,]+")
+
+# Lowercase markers used when scanning deal files
+_DEAL_NAME_MARKERS = ("deal name", "deal:")
+_LOSS_MARKERS = ("loss", "reason", "blocker")
+_COMPETITOR_MARKERS = ("competitor", "alternative vendor")
+
+
+# Deal headers live in the first ~20 lines; never read more than this per deal file
+_DEAL_READ_CAP = 16 * 1024
+
+def _dumps_capped(obj: Any, cap: int) -> str:
+    """Compact JSON of `obj` truncated to `cap` characters (orjson; UTF-8, no ASCII escaping)."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")[:cap]
+
+
+def _retrieved_text(retrieved: Iterable[str]) -> str:
+    """Top retrieved chunks as plain text separated by '---' (no JSON quoting or escaping)."""
+    return "\n---\n".join(str(chunk)[:400] for chunk in islice(retrieved, 5))[:2000]
+
+
+def _historical_signature(json_path: Path, deal_files: List[os.DirEntry]) -> tuple[Any, ...]:
+    """Cheap fingerprint of the historical sources used to invalidate the disk cache."""
+    json_mtime = json_path.stat().st_mtime_ns if json_path.exists() else None
+    latest = max((f.stat().st_mtime_ns for f in deal_files), default=0)
+    return (len(deal_files), latest, json_mtime)
 
 
 def _load_historical_deals() -> List[dict[str, Any]]:
@@ -29,35 +67,47 @@ def _load_historical_deals() -> List[dict[str, Any]]:
     1. /deals/ folder (synthetic deal documents)
     2. data/historical_deals.json (structured JSON)
     
+    Parsed deals are pickled to ``cache_dir/historical_deals.pkl`` and reused
+    while the file count and modification times are unchanged.
+    
     Returns:
         List of historical deal dictionaries
     """
     settings = get_settings()
+    json_path = settings.default_historical_data
+    deals_folder = Path("deals")
+    deal_files: List[os.DirEntry] = []
+    if deals_folder.is_dir():
+        with os.scandir(deals_folder) as entries:
+            deal_files = [e for e in entries if e.name.endswith(".txt") and e.is_file()]
+    
+    cache_path = settings.cache_dir / "historical_deals.pkl"
+    sig = None
+    try:
+        sig = _historical_signature(json_path, deal_files)
+        if cache_path.exists():
+            with cache_path.open("rb") as handle:
+                cached = pickle.load(handle)
+            if isinstance(cached, dict) and cached.get("sig") == sig:
+                return cached["deals"]
+    except Exception:
+        pass
+    
     deals = []
     
     # Load from JSON file if it exists
-    json_path = settings.default_historical_data
     if json_path.exists():
         try:
-            with json_path.open("r", encoding="utf-8") as handle:
-                json_deals = json.load(handle)
-                if isinstance(json_deals, list):
-                    deals.extend(json_deals)
+            json_deals = orjson.loads(json_path.read_bytes())
+            if isinstance(json_deals, list):
+                deals.extend(json_deals)
         except Exception:
             pass
     
-    # Load from /deals/ folder
-    deals_folder = Path("deals")
-    if deals_folder.exists():
-        for deal_file in deals_folder.glob("*.txt"):
-            try:
-                with deal_file.open("r", encoding="utf-8") as handle:
-                    content = handle.read()
-                    deal_data = _parse_deal_file(content, deal_file.name)
-                    if deal_data:
-                        deals.append(deal_data)
-            except Exception:
-                continue
+    # Load from /deals/ folder; reads are I/O-bound, so overlap them across threads
+    if deal_files:
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4, len(deal_files))) as executor:
+            deals.extend(deal for deal in executor.map(_read_and_parse, deal_files) if deal)
     
     # Return sample if no deals found
     if not deals:
@@ -72,55 +122,176 @@ def _load_historical_deals() -> List[dict[str, Any]]:
             }
         ]
     
+    if sig is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with cache_path.open("wb") as handle:
+                pickle.dump({"sig": sig, "deals": deals}, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            pass
+    
     return deals
 
 
+def _read_and_parse(deal_file: os.DirEntry) -> dict[str, Any] | None:
+    """Read the head of one deal file and parse it (None on any failure)."""
+    try:
+        with open(deal_file.path, "r", encoding="utf-8") as handle:
+            return _parse_deal_file(handle.read(_DEAL_READ_CAP), deal_file.name)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _cached_historical() -> tuple[dict[str, Any], ...]:
+    """Process-wide historical corpus shared by every ComparativeAgent."""
+    return tuple(_load_historical_deals())
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+@dataclass(frozen=True, slots=True)
+class HistoricalColumns:
+    """
+    Structure-of-arrays view of the historical corpus.
+    
+    Numeric fields are contiguous float64 arrays (NaN = missing) so aggregation and
+    ranking run vectorized; industries are interned to integer ids. Row i in every
+    column refers to historical deal i.
+    """
+
+    names: tuple[str, ...]
+    industries: tuple[str, ...]
+    industry_ids: np.ndarray
+    values: np.ndarray
+    competitor_risks: np.ndarray
+    pricing_deltas: np.ndarray
+    timeline_scores: np.ndarray
+
+    @classmethod
+    def from_deals(cls, deals: Iterable[dict[str, Any]]) -> HistoricalColumns:
+        deals = tuple(deals)
+        interned: dict[str, int] = {}
+        industry_ids = [interned.setdefault(str(d.get("industry") or "General"), len(interned)) for d in deals]
+        
+        def column(key: str) -> np.ndarray:
+            return np.fromiter((_as_float(d.get(key)) for d in deals), dtype=np.float64, count=len(deals))
+        
+        return cls(
+            names=tuple(str(d.get("deal_name") or "Historical Deal") for d in deals),
+            industries=tuple(interned),
+            industry_ids=np.asarray(industry_ids, dtype=np.int32),
+            values=column("value"),
+            competitor_risks=column("competitor_risk"),
+            pricing_deltas=column("pricing_delta"),
+            timeline_scores=column("timeline_score"),
+        )
+
+
+@lru_cache(maxsize=1)
+def _cached_columns() -> HistoricalColumns:
+    return HistoricalColumns.from_deals(_cached_historical())
+
+
+def _compute_benchmarks(columns: HistoricalColumns) -> dict[str, float]:
+    """
+    Aggregate benchmark statistics over the historical columns.
+    
+    Returns:
+        Dictionary of rounded averages plus deal value spread (keys absent when a column is empty)
+    """
+    benchmarks: dict[str, float] = {}
+    for name, array in (
+        ("average_deal_value", columns.values),
+        ("average_competitor_risk", columns.competitor_risks),
+        ("average_pricing_delta", columns.pricing_deltas),
+        ("average_timeline_score", columns.timeline_scores),
+    ):
+        present = array[~np.isnan(array)]
+        if present.size:
+            benchmarks[name] = round(float(present.mean()), 2)
+    values = columns.values[~np.isnan(columns.values)]
+    if values.size:
+        p50, p90 = np.percentile(values, (50, 90))
+        benchmarks["deal_value_std"] = round(float(values.std()), 2)
+        benchmarks["deal_value_p50"] = round(float(p50), 2)
+        benchmarks["deal_value_p90"] = round(float(p90), 2)
+    return benchmarks
+
+
+def _deal_text(deal: dict[str, Any]) -> str:
+    """Short text used to embed a historical deal for similarity ranking."""
+    return " ".join(
+        str(deal.get(key) or "")
+        for key in ("deal_name", "industry", "primary_loss_reason")
+    )
+
+
 def _parse_deal_file(content: str, filename: str) -> dict[str, Any] | None:
-    """Parse a deal text file and extract structured data."""
+    """Parse a deal text file and extract structured data in a single pass over its lines."""
     try:
         deal_name = "Unknown Deal"
-        for line in content.split("\n")[:10]:
-            if "deal name" in line.lower() or "deal:" in line.lower():
-                parts = line.split(":", 1)
-                if len(parts) > 1:
-                    deal_name = parts[1].strip()
-                    break
-        
         industry = "General"
-        for line in content.split("\n")[:15]:
-            if "industry" in line.lower():
-                parts = line.split(":", 1)
-                if len(parts) > 1:
-                    industry = parts[1].strip()
-                    break
-        
         value = None
-        for line in content.split("\n")[:20]:
-            if "value" in line.lower() and "$" in line:
-                import re
-                numbers = re.findall(r'\$?[\d,]+', line)
-                if numbers:
-                    try:
-                        value = float(numbers[0].replace("$", "").replace(",", ""))
-                    except ValueError:
-                        pass
+        loss_reason = "See deal document"
+        
+        # Header fields only live near the top of the file (deal name in the first
+        # 10 lines, industry in 15, value in 20); the loss reason may be anywhere.
+        needed = {"deal_name", "industry", "value", "loss_reason"}
+        for index, line in enumerate(content.splitlines()):
+            ll = line.lower()
+            
+            if "deal_name" in needed:
+                if index >= 10:
+                    needed.discard("deal_name")
+                elif any(marker in ll for marker in _DEAL_NAME_MARKERS):
+                    parts = line.split(":", 1)
+                    if len(parts) > 1:
+                        deal_name = parts[1].strip()
+                        needed.discard("deal_name")
+            
+            if "industry" in needed:
+                if index >= 15:
+                    needed.discard("industry")
+                elif "industry" in ll:
+                    parts = line.split(":", 1)
+                    if len(parts) > 1:
+                        industry = parts[1].strip()
+                        needed.discard("industry")
+            
+            if "value" in needed:
+                if index >= 20:
+                    needed.discard("value")
+                elif "value" in ll and "$" in line:
+                    numbers = _MONEY_RE.findall(line)
+                    if numbers:
+                        try:
+                            value = float(numbers[0].replace("$", "").replace(",", ""))
+                        except ValueError:
+                            pass
+                    needed.discard("value")
+            
+            # Extract loss reason
+            if "loss_reason" in needed:
+                if any(marker in ll for marker in _LOSS_MARKERS) and len(line.strip()) > 20:
+                    loss_reason = line.strip()[:200]
+                    needed.discard("loss_reason")
+            
+            if not needed:
                 break
         
         competitor_risk = 0.5
         content_lower = content.lower()
-        if "competitor" in content_lower or "alternative vendor" in content_lower:
+        if any(marker in content_lower for marker in _COMPETITOR_MARKERS):
             competitor_risk = 0.7
         if "lost to" in content_lower:
             competitor_risk = 0.8
         
-        # Extract loss reason
-        loss_reason = "See deal document"
-        for line in content.split("\n"):
-            if "loss" in line.lower() or "reason" in line.lower() or "blocker" in line.lower():
-                if len(line.strip()) > 20:
-                    loss_reason = line.strip()[:200]
-                    break
-        
         return {
             "deal_name": deal_name,
             "industry": industry,
@@ -134,7 +305,10 @@ def _parse_deal_file(content: str, filename: str) -> dict[str, Any] | None:
         return None
 
 
-PROMPT_TEMPLATE = """
+# Prompts use string.Template ($name placeholders, $$ for a literal dollar sign)
+# so the literal JSON schema braces need no escaping and substitution skips
+# str.format's format-spec parsing.
+INSTRUCTIONS = """
 You are an expert sales analyst specializing in deal benchmarking, pattern detection, and competitive analysis.
 
 Your task: Compare the target deal against historical lost deals and identify patterns, common mistakes, and insights.
@@ -146,7 +320,7 @@ CRITICAL REQUIREMENTS:
    - For each similar deal, provide:
      * deal_name: name of similar deal
      * similarity_reason: specific reason why it's similar (be detailed)
-     * outcome: what happened (e.g., "Lost to Competitor X due to pricing gap of $50K")
+     * outcome: what happened (e.g., "Lost to Competitor X due to pricing gap of $$50K")
      * similarity_score: float 0-1 (1 = very similar)
 
 2. PATTERN DETECTION - Identify common mistakes across deals:
@@ -171,14 +345,14 @@ CRITICAL REQUIREMENTS:
    - What differentiated winning vs losing deals?
 
 Return JSON with these keys:
-{{
+{
   "similar_deals": [
-    {{
+    {
       "deal_name": "Deal name",
       "similarity_reason": "Detailed reason for similarity",
       "outcome": "What happened",
       "similarity_score": 0.0-1.0
-    }},
+    },
     ...  // 3-5 deals
   ],
   "common_patterns": [
@@ -191,33 +365,63 @@ Return JSON with these keys:
     "Risk factor 2",
     ...  // 5-8 risk factors
   ],
-  "benchmark_scores": {{
+  "benchmark_scores": {
     "average_deal_value": number,
     "average_competitor_risk": 0-1,
     "average_pricing_delta": 0-1,
-    "average_timeline_weeks": number
-  }},
+    "average_timeline_score": 0-10,
+    "deal_value_std": number,
+    "deal_value_p50": number,
+    "deal_value_p90": number
+  },
   "insights_summary": "Comprehensive summary of insights and patterns",
   "competitor_risk": 0-1,
   "pricing_delta": 0-1,
   "trend_analysis": ["trend 1", "trend 2", ...],
   "comparative_table": [
-    {{"metric": "Deal Value", "target_deal": "value", "benchmark_average": "value"}},
+    {"metric": "Deal Value", "target_deal": "value", "benchmark_average": "value"},
     ...
   ]
-}}
+}
+""".strip()
+
+PROMPT_TEMPLATE = Template(INSTRUCTIONS + """
 
 Context:
-Target Deal: {deal_summary}
-Timeline: {timeline}
-Retrieved Notes: {retrieved}
-Historical Benchmarks: {historical}
+Target Deal: $deal_summary
+Timeline: $timeline
+Retrieved Notes:
+$retrieved
+Historical Benchmarks: $historical
 
 Be analytical, specific, and focus on actionable patterns.
-""".strip()
+""")
+
+# Batch prompting: the instruction block is sent once, followed by one indexed
+# section per target deal, and the model answers with an indexed results array.
+BATCH_PROMPT_TEMPLATE = Template(INSTRUCTIONS + """
+
+You are given $count target deals. Analyze EACH deal independently against the shared historical benchmarks.
+
+Historical Benchmarks: $historical
+
+$deals
+
+Return JSON with a single key "results": a list with exactly one object per deal, in the format above, plus an "index" key matching the deal's [index]:
+{"results": [{"index": 1, "similar_deals": [...], ...}, {"index": 2, ...}]}
+
+Be analytical, specific, and focus on actionable patterns.
+""")
+
+DEAL_SECTION_TEMPLATE = Template("""
+### Deal [$index]
+Target Deal: $deal_summary
+Timeline: $timeline
+Retrieved Notes:
+$retrieved
+""".strip())
 
 
-@dataclass
 class ComparativeAgent(BaseAgent):
     """
     Agent that benchmarks deals against historical data with pattern detection.
@@ -225,9 +429,60 @@ class ComparativeAgent(BaseAgent):
     Uses RAG to retrieve similar deals and LLM to perform deep comparative analysis.
     """
 
-    def __init__(self) -> None:
-        """Initialize the comparative agent with historical deal data."""
-        self.historical = _load_historical_deals()
+    __slots__ = ("historical", "top_k", "embedding_service", "_historical_json", "_deal_embeddings", "columns", "_benchmarks")
+
+    def __init__(self, embedding_service: Any | None = None, top_k: int = 8) -> None:
+        """
+        Initialize the comparative agent with historical deal data.
+        
+        Args:
+            embedding_service: Object with embed_documents/embed_query (e.g. EmbeddingService)
+                used to rank historical deals by similarity; a hashing embedder is used if omitted
+            top_k: Number of most similar historical deals sent with each single-deal prompt
+        """
+        self.historical = _cached_historical()
+        self.top_k = top_k
+        self.embedding_service = embedding_service or HashingEmbedder()
+        # The historical corpus is static for the agent's lifetime, so serialize it once
+        self._historical_json = _dumps_capped(self.historical[:15], 5000)  # Top 15 deals
+        self._deal_embeddings = self._embed_historical()
+        # Columnar view shared with every agent; benchmarks are a pure function of it
+        self.columns = _cached_columns()
+        self._benchmarks = _compute_benchmarks(self.columns)
+    
+    def _embed_historical(self) -> np.ndarray | None:
+        """Row-normalized embedding matrix of the historical deals (None if embedding fails)."""
+        try:
+            matrix = np.asarray(
+                self.embedding_service.embed_documents([_deal_text(deal) for deal in self.historical]),
+                dtype=np.float32,
+            )
+        except Exception:
+            return None
+        if matrix.ndim != 2 or len(matrix) != len(self.historical):
+            return None
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    def _relevant_historical_json(self, deal_summary: str) -> str:
+        """Serialize only the top-K historical deals most similar to the target deal."""
+        if self._deal_embeddings is None or len(self.historical) <= self.top_k:
+            return self._historical_json
+        try:
+            query = np.asarray(self.embedding_service.embed_query(deal_summary[:2000]), dtype=np.float32)
+        except Exception:
+            return self._historical_json
+        sims = self._deal_embeddings @ query
+        top = np.argpartition(-sims, self.top_k)[:self.top_k]
+        top = top[np.argsort(-sims[top])]
+        return _dumps_capped([self.historical[i] for i in top], 5000)
+    
+    @classmethod
+    def reload(cls) -> None:
+        """Drop the shared historical corpus so the next agent re-reads it from disk."""
+        _cached_historical.cache_clear()
+        _cached_columns.cache_clear()
     
     def analyze(
         self,
@@ -255,71 +510,153 @@ class ComparativeAgent(BaseAgent):
             - trend_analysis: List of trends
             - comparative_table: Table data for display
         """
-        prompt = PROMPT_TEMPLATE.format(
+        prompt = self._build_prompt(deal_summary, timeline, retrieved)
+        
+        try:
+            return self._finalize(generate_json(prompt), timeline)
+        except Exception:
+            return self._default_comparative()
+
+    async def analyze_async(
+        self,
+        deal_summary: str,
+        timeline: dict[str, Any],
+        retrieved: Iterable[str],
+    ) -> dict[str, Any]:
+        """Async variant of `analyze`; awaits the LLM call so several deals can overlap."""
+        prompt = self._build_prompt(deal_summary, timeline, retrieved)
+        
+        try:
+            return self._finalize(await generate_json_async(prompt), timeline)
+        except Exception:
+            return self._default_comparative()
+
+    def _build_prompt(
+        self,
+        deal_summary: str,
+        timeline: dict[str, Any],
+        retrieved: Iterable[str],
+    ) -> str:
+        return PROMPT_TEMPLATE.substitute(
             deal_summary=deal_summary[:2000],
-            timeline=json.dumps(timeline, ensure_ascii=False)[:4000],
-            retrieved=json.dumps(list(retrieved)[:5], ensure_ascii=False)[:2000],
-            historical=json.dumps(self.historical[:15], ensure_ascii=False)[:5000],  # Top 15 deals
+            timeline=_dumps_capped(timeline, 4000),
+            retrieved=_retrieved_text(retrieved),
+            historical=self._relevant_historical_json(deal_summary),
         )
+
+    def analyze_batch(
+        self,
+        items: list[tuple[str, dict[str, Any], Iterable[str]]],
+    ) -> list[dict[str, Any]]:
+        """
+        Analyze several deals with a single LLM call (batch prompting).
         
-        try:
-            result = generate_json(prompt)
-            
-            if not isinstance(result, dict):
-                return self._default_comparative()
-            
-            # Ensure all required fields exist
-            result.setdefault("similar_deals", [])
-            if len(result.get("similar_deals", [])) < 3:
-                result["similar_deals"].extend(self._generate_additional_similar_deals())
-            
-            result.setdefault("common_patterns", [])
-            if len(result.get("common_patterns", [])) < 5:
-                result["common_patterns"].extend(self._generate_patterns(timeline))
-            
-            result.setdefault("shared_risk_factors", [])
-            result.setdefault("benchmark_scores", {})
-            result.setdefault("insights_summary", "See patterns and risk factors above")
-            result.setdefault("competitor_risk", 0.5)
-            result.setdefault("pricing_delta", 0.5)
-            result.setdefault("trend_analysis", [])
-            result.setdefault("comparative_table", [])
-            
-            return result
+        Args:
+            items: List of (deal_summary, timeline, retrieved) tuples
             
+        Returns:
+            One comparative analysis per item, in input order (same shape as `analyze`)
+        """
+        if not items:
+            return []
+        
+        sections = [
+            DEAL_SECTION_TEMPLATE.substitute(
+                index=index,
+                deal_summary=deal_summary[:2000],
+                timeline=_dumps_capped(timeline, 4000),
+                retrieved=_retrieved_text(retrieved),
+            )
+            for index, (deal_summary, timeline, retrieved) in enumerate(items, 1)
+        ]
+        prompt = BATCH_PROMPT_TEMPLATE.substitute(
+            count=len(items),
+            historical=self._historical_json,
+            deals="\n\n".join(sections),
+        )
+        
+        try:
+            response = generate_json(prompt)
         except Exception:
+            return [self._default_comparative() for _ in items]
+        
+        # Dispatch indexed results back to their deals; missing entries fall back to defaults
+        by_index: dict[int, dict[str, Any]] = {}
+        results = response.get("results") if isinstance(response, dict) else None
+        if isinstance(results, list):
+            for entry in results:
+                if isinstance(entry, dict) and isinstance(entry.get("index"), int):
+                    by_index[entry.pop("index")] = entry
+        
+        comparatives = []
+        for index, (_, timeline, _) in enumerate(items, 1):
+            try:
+                comparatives.append(self._finalize(by_index.get(index), timeline))
+            except Exception:
+                comparatives.append(self._default_comparative())
+        return comparatives
+
+    def _finalize(self, result: Any, timeline: dict[str, Any]) -> dict[str, Any]:
+        """Fill in missing fields of an LLM comparative result."""
+        if not isinstance(result, dict):
             return self._default_comparative()
+        
+        # Ensure all required fields exist
+        similar_deals = result.setdefault("similar_deals", [])
+        if len(similar_deals) < 3:
+            similar_deals.extend(self._generate_additional_similar_deals())
+        
+        common_patterns = result.setdefault("common_patterns", [])
+        if len(common_patterns) < 5:
+            common_patterns.extend(self._generate_patterns(timeline))
+        
+        if not result.get("benchmark_scores"):
+            result["benchmark_scores"] = dict(self._benchmarks)
+        for key, default in (
+            ("shared_risk_factors", []),
+            ("insights_summary", "See patterns and risk factors above"),
+            ("competitor_risk", 0.5),
+            ("pricing_delta", 0.5),
+            ("trend_analysis", []),
+            ("comparative_table", []),
+        ):
+            result.setdefault(key, default)
+        
+        return result
     
     def _generate_additional_similar_deals(self) -> list[dict]:
         """Generate additional similar deals from historical data."""
-        similar = []
-        for deal in self.historical[:3]:
-            similar.append({
+        return [
+            {
                 "deal_name": deal.get("deal_name", "Historical Deal"),
                 "similarity_reason": f"Similar industry ({deal.get('industry', 'General')}) and deal characteristics",
                 "outcome": deal.get("primary_loss_reason", "Lost deal"),
                 "similarity_score": 0.6
-            })
-        return similar
+            }
+            for deal in self.historical[:3]
+        ]
     
     def _generate_patterns(self, timeline: dict) -> list[str]:
         """Generate common patterns based on timeline analysis."""
-        patterns = []
-        
         events = timeline.get("events", [])
-        pricing_events = [e for e in events if isinstance(e, dict) and "pricing" in e.get("phase", "").lower()]
-        if len(pricing_events) > 1:
-            patterns.append("Multiple pricing negotiations indicate pricing ambiguity")
-        
-        negative_events = [e for e in events if isinstance(e, dict) and e.get("sentiment") == "negative"]
-        if len(negative_events) > len(events) * 0.3:
-            patterns.append("High proportion of negative sentiment events suggests communication issues")
-        
-        escalation_events = [e for e in events if isinstance(e, dict) and "escalation" in e.get("phase", "").lower()]
-        if escalation_events:
-            patterns.append("Escalation phases indicate unresolved issues")
+        pricing_count = negative_count = escalation_count = 0
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            phase = event.get("phase", "").lower()
+            if "pricing" in phase:
+                pricing_count += 1
+            if "escalation" in phase:
+                escalation_count += 1
+            if event.get("sentiment") == "negative":
+                negative_count += 1
         
-        return patterns
+        checks = (
+            (pricing_count > 1, "Multiple pricing negotiations indicate pricing ambiguity"),
+            (negative_count > len(events) * 0.3, "High proportion of negative sentiment events suggests communication issues"),
+            (escalation_count > 0, "Escalation phases indicate unresolved issues"),
+        )
+        return [pattern for matched, pattern in checks if matched]
     
     def _default_comparative(self) -> dict[str, Any]:
         """Return default comparative analysis when LLM fails."""
@@ -348,11 +685,11 @@ class ComparativeAgent(BaseAgent):
                 "Competitive pressure",
                 "Timeline delays"
             ],
-            "benchmark_scores": {
+            "benchmark_scores": dict(self._benchmarks) or {
                 "average_deal_value": 300000,
                 "average_competitor_risk": 0.6,
                 "average_pricing_delta": 0.5,
-                "average_timeline_weeks": 8
+                "average_timeline_score": 5.0
             },
             "insights_summary": "Common patterns include pricing ambiguity, communication delays, and competitive pressure",
             "competitor_risk": 0.5,
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
+from functools import cache
 from typing import Any, TypedDict
 
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import END, StateGraph
 
 from agents import ComparativeAgent, PlaybookAgent, TimelineAgent
@@ -21,19 +24,48 @@ class GraphState(TypedDict, total=False):
     scorecard: dict[str, float]
 
 
-@dataclass
+class BatchGraphState(TypedDict):
+    states: list[GraphState]
+
+
+# Key under config["configurable"] carrying the DealForensicsGraph whose agents
+# should serve the current run; the compiled graphs themselves are shared.
+_GRAPH_KEY = "deal_forensics_graph"
+
+
+def _dispatch(method: str, async_method: str | None = None) -> RunnableLambda:
+    """Node that forwards to `method` (or `async_method` under ainvoke) on the run's graph instance."""
+
+    def func(state: Any, config: RunnableConfig) -> Any:
+        return getattr(config["configurable"][_GRAPH_KEY], method)(state)
+
+    if async_method is None:
+        return RunnableLambda(func, name=method)
+
+    async def afunc(state: Any, config: RunnableConfig) -> Any:
+        return await getattr(config["configurable"][_GRAPH_KEY], async_method)(state)
+
+    return RunnableLambda(func, afunc=afunc, name=method)
+
+
+@dataclass(slots=True)
 class DealForensicsGraph:
     timeline_agent: TimelineAgent
     comparative_agent: ComparativeAgent
     playbook_agent: PlaybookAgent
     scorer: DealScorer
+    comparative_batch_size: int = 4
 
-    def __post_init__(self) -> None:
+    @classmethod
+    @cache
+    def _compiled_graph(cls) -> Any:
+        """Single-deal graph, compiled once per process and shared by all instances."""
+        # LLM-bound nodes carry an async implementation used by `ainvoke`/`run_many`
         graph = StateGraph(GraphState)
-        graph.add_node("timeline", self._timeline_node)
-        graph.add_node("comparative", self._comparative_node)
-        graph.add_node("playbook", self._playbook_node)
-        graph.add_node("score", self._score_node)
+        graph.add_node("timeline", _dispatch("_timeline_node", "_atimeline_node"))
+        graph.add_node("comparative", _dispatch("_comparative_node", "_acomparative_node"))
+        graph.add_node("playbook", _dispatch("_playbook_node", "_aplaybook_node"))
+        graph.add_node("score", _dispatch("_score_node"))
 
         graph.set_entry_point("timeline")
         graph.add_edge("timeline", "comparative")
@@ -41,7 +73,31 @@ class DealForensicsGraph:
         graph.add_edge("playbook", "score")
         graph.add_edge("score", END)
 
-        self._graph = graph.compile()
+        return graph.compile()
+
+    @classmethod
+    @cache
+    def _compiled_batch_graph(cls) -> Any:
+        """
+        Same topology over a list of deals; the comparative step issues one
+        LLM call per `comparative_batch_size` deals instead of one per deal.
+        """
+        batch_graph = StateGraph(BatchGraphState)
+        batch_graph.add_node("timeline", _dispatch("_batch_timeline_node"))
+        batch_graph.add_node("comparative", _dispatch("_batch_comparative_node"))
+        batch_graph.add_node("playbook", _dispatch("_batch_playbook_node"))
+        batch_graph.add_node("score", _dispatch("_batch_score_node"))
+
+        batch_graph.set_entry_point("timeline")
+        batch_graph.add_edge("timeline", "comparative")
+        batch_graph.add_edge("comparative", "playbook")
+        batch_graph.add_edge("playbook", "score")
+        batch_graph.add_edge("score", END)
+
+        return batch_graph.compile()
+
+    def _config(self) -> RunnableConfig:
+        return {"configurable": {_GRAPH_KEY: self}}
 
     def _timeline_node(self, state: GraphState) -> GraphState:
         timeline = self.timeline_agent.analyze(state["raw_context"])
@@ -64,6 +120,27 @@ class DealForensicsGraph:
         )
         return {**state, "playbook": playbook}
 
+    async def _atimeline_node(self, state: GraphState) -> GraphState:
+        timeline = await self.timeline_agent.analyze_async(state["raw_context"])
+        return {**state, "timeline": timeline}
+
+    async def _acomparative_node(self, state: GraphState) -> GraphState:
+        comparative = await self.comparative_agent.analyze_async(
+            deal_summary=state["deal_summary"],
+            timeline=state["timeline"],
+            retrieved=state.get("retrieved_chunks", []),
+        )
+        return {**state, "comparative": comparative}
+
+    async def _aplaybook_node(self, state: GraphState) -> GraphState:
+        playbook = await self.playbook_agent.analyze_async(
+            deal_summary=state["deal_summary"],
+            timeline=state["timeline"],
+            comparative=state["comparative"],
+            raw_document=state.get("raw_context", ""),
+        )
+        return {**state, "playbook": playbook}
+
     def _score_node(self, state: GraphState) -> GraphState:
         scorecard = self.scorer.score(
             timeline=state["timeline"],
@@ -72,6 +149,51 @@ class DealForensicsGraph:
         )
         return {**state, "scorecard": scorecard.as_dict()}
 
+    def _batch_timeline_node(self, batch: BatchGraphState) -> BatchGraphState:
+        return {"states": [self._timeline_node(state) for state in batch["states"]]}
+
+    def _batch_comparative_node(self, batch: BatchGraphState) -> BatchGraphState:
+        states = batch["states"]
+        size = max(1, self.comparative_batch_size)
+        comparatives: list[dict[str, Any]] = []
+        for start in range(0, len(states), size):
+            chunk = states[start:start + size]
+            comparatives.extend(
+                self.comparative_agent.analyze_batch(
+                    [
+                        (state["deal_summary"], state["timeline"], state.get("retrieved_chunks", []))
+                        for state in chunk
+                    ]
+                )
+            )
+        return {
+            "states": [
+                {**state, "comparative": comparative}
+                for state, comparative in zip(states, comparatives)
+            ]
+        }
+
+    def _batch_playbook_node(self, batch: BatchGraphState) -> BatchGraphState:
+        return {"states": [self._playbook_node(state) for state in batch["states"]]}
+
+    def _batch_score_node(self, batch: BatchGraphState) -> BatchGraphState:
+        return {"states": [self._score_node(state) for state in batch["states"]]}
+
     def run(self, initial_state: GraphState) -> GraphState:
-        return self._graph.invoke(initial_state)
+        return self._compiled_graph().invoke(initial_state, config=self._config())
+
+    async def _run_one(self, initial_state: GraphState) -> GraphState:
+        return await self._compiled_graph().ainvoke(initial_state, config=self._config())
+
+    async def run_many(self, initial_states: list[GraphState]) -> list[GraphState]:
+        """Run several deals concurrently so their LLM round-trips overlap."""
+        return list(await asyncio.gather(*(self._run_one(state) for state in initial_states)))
+
+    def run_batch(self, initial_states: list[GraphState]) -> list[GraphState]:
+        """Run several deals through the graph, batching the comparative LLM calls."""
+        if not initial_states:
+            return []
+        return self._compiled_batch_graph().invoke(
+            {"states": list(initial_states)}, config=self._config()
+        )["states"]
 
@@ -12,35 +12,45 @@ All insights are document-specific and based on actual deal content.
 
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
-import json
+from functools import lru_cache
+from itertools import chain
+from string import Formatter
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Iterator, Mapping, NamedTuple, Sequence
+import hashlib
 import re
 
+import orjson
+
 from agents.base import BaseAgent
-from core.gemini_client import generate_json
+from core.cache import LLMCache, SemanticCache
+from core.config import get_settings
+from core.gemini_client import DEFAULT_MODEL, generate_json, generate_json_async
+from rag.hashing import HashingEmbedder
 
 
-PROMPT_TEMPLATE = """
-You are an expert revenue operations strategist and sales excellence consultant with deep experience in deal post-mortems.
+# Raw LLM playbooks keyed by the (truncated) prompt inputs and model; 24h TTL
+_llm_cache = LLMCache(maxsize=get_settings().llm_cache_size, default_ttl=86400)
 
-CRITICAL: You MUST analyze the ACTUAL DEAL DOCUMENT below and generate document-specific insights. DO NOT use generic responses.
+# Near-duplicate deals (same prompt skeleton and loss drivers, cosine >= 0.92 over the
+# slot values) reuse a cached playbook after entity substitution instead of calling the LLM.
+_semantic_cache = SemanticCache(threshold=0.92)
+_slot_embedder = HashingEmbedder()
 
-Your task: Analyze THIS SPECIFIC deal failure and create a HIGHLY ACTIONABLE recovery playbook based on what actually happened in THIS deal.
-
-DEAL DOCUMENT CONTENT:
-{raw_document}
 
-TIMELINE ANALYSIS:
-{timeline}
+# Static instructions, sent as the system instruction so every playbook call shares the
+# same prefix and the provider can serve it from its prompt cache
+SYSTEM_INSTRUCTIONS = """
+You are an expert revenue operations strategist and sales excellence consultant with deep experience in deal post-mortems.
 
-COMPARATIVE INSIGHTS:
-{comparative}
+CRITICAL: You MUST analyze the ACTUAL DEAL DOCUMENT provided and generate document-specific insights. DO NOT use generic responses.
 
-DEAL SUMMARY:
-{deal_summary}
+Your task: Analyze THIS SPECIFIC deal failure and create a HIGHLY ACTIONABLE recovery playbook based on what actually happened in THIS deal.
 
-CRITICAL REQUIREMENTS - Analyze the document above and produce:
+CRITICAL REQUIREMENTS - Analyze the deal document and produce:
 
 1. WHAT WENT WRONG (Root Causes) - Output EXACTLY 6-10 specific points based on THIS deal:
    - Extract specific issues from the document: pricing renegotiations, communication breakdowns, delivery delays, competitor mentions
@@ -72,19 +82,524 @@ CRITICAL REQUIREMENTS - Analyze the document above and produce:
    - Format: List of 6-10 best practice recommendations
 
 Return JSON with these EXACT keys:
-{{
+{
   "what_went_wrong": ["specific root cause 1 from document", "specific root cause 2 from document", ...],  // EXACTLY 6-10 items
   "red_flags": ["specific red flag 1 from document", "specific red flag 2 from document", ...],  // EXACTLY 6-10 items
   "recommendations": [
-    {{"priority": "High/Med/Low", "action": "specific action addressing document issue", "impact": 1-10, "owner": "Sales Rep/Sales Manager/Product Team"}},
+    {"priority": "High/Med/Low", "action": "specific action addressing document issue", "impact": 1-10, "owner": "Sales Rep/Sales Manager/Product Team"},
     ...
   ],  // EXACTLY 8-12 items
   "best_practices": ["best practice 1", "best practice 2", ...]  // EXACTLY 6-10 items
-}}
+}
 
-REMEMBER: All insights MUST be based on the actual deal document content above. Be specific, not generic.
+REMEMBER: All insights MUST be based on the actual deal document content provided. Be specific, not generic.
 """.strip()
 
+# Per-deal content, sent after the static prefix
+PROMPT_TEMPLATE = """
+DEAL DOCUMENT CONTENT:
+{raw_document}
+
+TIMELINE ANALYSIS:
+{timeline}
+
+COMPARATIVE INSIGHTS:
+{comparative}
+
+DEAL SUMMARY:
+{deal_summary}
+""".strip()
+
+# PROMPT_TEMPLATE pre-split into (literal, field) pairs so rendering is a single join
+_PROMPT_PARTS = tuple((literal, field) for literal, field, _, _ in Formatter().parse(PROMPT_TEMPLATE))
+
+# Fixed part of the prompt; cached playbooks are only reused under the same template
+_PROMPT_SKELETON = hashlib.sha256(f"{SYSTEM_INSTRUCTIONS}\0{PROMPT_TEMPLATE}".encode("utf-8")).hexdigest()
+
+
+# Patterns used when mining the raw document; compiled once at import
+_PRICING_RE = re.compile(r"\b(?:pricing|price|budget|cost)\b")
+# Whole amounts only: "$500,000" (no trailing comma), "10 k" but not the "10 k" of "10 key"
+_PRICE_AMOUNT_RE = re.compile(r"\$\d[\d,]*(?<!,)|\b\d[\d,]*\s*(?:k|thousand|million)\b", re.IGNORECASE)
+_GAP_RE = re.compile(r"gap[:\s]+(\$?[\d,]+|\d+%)", re.IGNORECASE)
+_DELAY_RE = re.compile(r"delay[ed]?\s+(?:of|for)?\s*(\d+\s*(?:days?|weeks?|months?))")
+# Competitor-name patterns in priority order. Kept as separate searches rather than one
+# alternation: a merged pattern reports the leftmost candidate (whose span can hide a
+# higher-priority one), and each literal-led pattern here uses the engine's prefix scan
+# and stops at its first hit, which measured faster than a single combined pass.
+_COMPETITOR_RES = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"lost to ([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){0,2})",  # Company name (1-3 words, capitalized)
+        r"competitor[:\s]+([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){0,2})",  # More precise
+        r"alternative vendor[:\s]+([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){0,2})",
+        r"([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){0,2})\s+(?:solutions|systems|technologies|corp|inc|llc|ltd)",
+        r"([A-Z][a-zA-Z]+)\s+(?:solutions|systems|technologies)",  # Single word + solutions
+    )
+)
+_COMPETITOR_NOISE_RE = re.compile(
+    r"\b(was|is|the|a|an|vendor|solution|company|due|to|pricing|concerns|and|delivery|timeline)\b",
+    re.IGNORECASE,
+)
+_SPACE_RE = re.compile(r"\s+")
+
+# Every keyword _extract_document_insights checks, collected once per document
+_VAGUE_DATE_KEYWORDS = ("q1", "q2", "q3", "q4", "sometime", "flexible", "tbd", "to be determined")
+_INSIGHT_KEYWORDS = frozenset((
+    "pricing gap", "budget gap", "competitor",
+    "delay", "timeline", "delivery", "vague", "tbd", "flexible",
+    "delayed response", "no response", "miscommunication",
+    "verbal", "agreement", "commitment", "discount",
+    "escalation", "escalated", "warranty", "guarantee", "penalty", "consequence",
+    *_VAGUE_DATE_KEYWORDS,
+))
+
+# Every keyword the _generate_additional_* helpers check, collected once and shared by all four
+_GENERATOR_KEYWORDS = frozenset((
+    "warranty", "guarantee", "penalty", "consequence", "written", "documented",
+    "customer said", "customer mentioned", "tbd", "to be determined", "discount", "verbal",
+    "timeline", "vague", "crm",
+))
+
+
+def _generator_terms(raw_document: str) -> set[str]:
+    """Return the _GENERATOR_KEYWORDS present in the document."""
+    lowered = raw_document.lower()
+    return {keyword for keyword in _GENERATOR_KEYWORDS if keyword in lowered}
+
+
+def _extract_competitor_name(document: str) -> str:
+    """Best-effort competitor name mentioned in the document ("" if none)."""
+    competitor_name = ""
+    for pattern in _COMPETITOR_RES:
+        match = pattern.search(document)
+        if match:
+            competitor_name = match.group(1).strip()
+            # Clean up common words
+            competitor_name = _COMPETITOR_NOISE_RE.sub('', competitor_name).strip()
+            # Remove extra spaces
+            competitor_name = _SPACE_RE.sub(' ', competitor_name).strip()
+            # Limit to reasonable length (30 chars for company name)
+            if 3 < len(competitor_name) <= 30:
+                break
+            elif len(competitor_name) > 30:
+                # Take first 2 words if too long
+                words = competitor_name.split()[:2]
+                competitor_name = ' '.join(words)
+                if len(competitor_name) <= 30:
+                    break
+                else:
+                    competitor_name = ""
+
+    return competitor_name
+
+
+def _cacheable(result: Any) -> bool:
+    """Only well-formed playbooks are worth replaying; unparsed responses should be retried."""
+    return isinstance(result, dict) and "parse_error" not in result
+
+
+def _render_prompt(**values: str) -> str:
+    """Fill PROMPT_TEMPLATE's placeholders from `values` (same output as str.format)."""
+    parts: list[str] = []
+    for literal, field in _PROMPT_PARTS:
+        parts.append(literal)
+        if field is not None:
+            parts.append(values[field])
+    return "".join(parts)
+
+
+def _fastjson(obj: Any) -> str:
+    """Compact UTF-8 JSON of `obj` via orjson (no ASCII escaping, non-string keys allowed)."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+def _extract_prices(document: str) -> list[str]:
+    """Price amounts mentioned in the document, in order of appearance."""
+    return _PRICE_AMOUNT_RE.findall(document)
+
+
+class Recommendation(NamedTuple):
+    """A prioritized action item; converted to a plain dict where a playbook is returned."""
+
+    priority: str
+    action: str
+    impact: int
+    owner: str
+
+
+@dataclass(frozen=True, slots=True)
+class EventSummary:
+    """Timeline counters shared by the playbook top-up generators (one pass over the events)."""
+
+    total: int = 0
+    negative: int = 0
+    escalation: int = 0
+    pricing: int = 0
+    vague_timestamps: int = 0
+    communication_total: int = 0
+    communication_negative: int = 0
+
+
+def _summarize_events(timeline: dict) -> EventSummary:
+    events = timeline.get("events", [])
+    negative = escalation = pricing = vague = 0
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        phase = event.get("phase", "").lower()
+        timestamp = str(event.get("timestamp", "")).lower()
+        if event.get("sentiment") == "negative":
+            negative += 1
+        if "escalation" in phase:
+            escalation += 1
+        if "pricing" in phase:
+            pricing += 1
+        if "week" in timestamp or "month" in timestamp:
+            vague += 1
+    
+    comm_events = timeline.get("communication_events", [])
+    comm_negative = sum(1 for c in comm_events if isinstance(c, dict) and c.get("sentiment") == "negative")
+    return EventSummary(
+        total=len(events),
+        negative=negative,
+        escalation=escalation,
+        pricing=pricing,
+        vague_timestamps=vague,
+        communication_total=len(comm_events),
+        communication_negative=comm_negative,
+    )
+
+
+def _loss_skeleton(document: str, timeline: dict, comparative: dict) -> str:
+    """
+    Semantic-cache group for a deal: the prompt skeleton plus its loss drivers (insight
+    keywords present and the pricing/timeline/comparative thresholds the generators use),
+    so a cached playbook is only reused for a deal that lost for the same reasons.
+    """
+    lowered = document.lower()
+    summary = _summarize_events(timeline)
+    hits = sorted(keyword for keyword in _INSIGHT_KEYWORDS if keyword in lowered)
+    flags = (
+        len(_PRICING_RE.findall(lowered)) > 2,
+        comparative.get("pricing_delta", 0) > 0.5,
+        comparative.get("competitor_risk", 0) > 0.6,
+        summary.escalation > 0,
+        summary.vague_timestamps > 0,
+        summary.pricing > 2,
+    )
+    signals = ",".join(hits) + ":" + "".join("1" if flag else "0" for flag in flags)
+    return f"{_PROMPT_SKELETON}:{hashlib.sha256(signals.encode('utf-8')).hexdigest()}"
+
+def _text_key(item: Any) -> Any:
+    """Dedupe identity for section items: text compares case- and whitespace-insensitively."""
+    return " ".join(item.lower().split()) if type(item) is str else item
+
+
+def _action_key(item: Any) -> Any:
+    """Dedupe identity for recommendations: their (validated) action text."""
+    kind = type(item)
+    if kind is Recommendation:
+        action = item.action
+    elif kind is dict:
+        action = item.get("action", _DEFAULT_REC_FIELDS["action"])
+    else:
+        action = item
+    if type(action) is str:
+        return _text_key(action)
+    # Malformed entries may be unhashable; keep each one distinct and let validation drop it
+    return id(item)
+
+
+def _dedupe_cap(items: Iterable[Any], cap: int, key: Callable[[Any], Any] = _text_key) -> list[Any]:
+    """First `cap` distinct items (by `key`) in order, keeping the first original of each."""
+    seen: set[Any] = set()
+    out: list[Any] = []
+    add, append = seen.add, out.append
+    for item in items:
+        identity = key(item)
+        if identity not in seen:
+            add(identity)
+            append(item)
+            if len(out) >= cap:
+                break
+    return out
+
+
+def _top_up_section(
+    seed: Any,
+    extra: Iterable[Any],
+    more: Callable[[], Iterable[Any]],
+    defaults: Sequence[Any],
+    minimum: int,
+    cap: int,
+    key: Callable[[Any], Any] = _text_key,
+) -> list[Any]:
+    """
+    Build one playbook section from the LLM's list (`seed`, ignored unless a list) plus
+    `extra`; below `minimum`, extend with `more()` and then pad from `defaults`.
+    """
+    items = seed if isinstance(seed, list) else []
+    items.extend(extra)
+    if len(items) < minimum:
+        items.extend(more())
+    if len(items) < minimum:
+        items.extend(defaults[:minimum - len(items)])
+    return _dedupe_cap(items, cap, key)
+
+
+@lru_cache(maxsize=256)
+def _replacement_pattern(olds: tuple[str, ...]) -> re.Pattern[str]:
+    """
+    Alternation matching any of `olds` as a whole token (pass longest first), so "$50"
+    never matches inside "$500,000"; compiled once per entity set.
+    """
+    return re.compile(
+        r"(?<![\w$])(?:" + "|".join(re.escape(old) for old in olds) + r")(?!\w|[.,]\d)"
+    )
+
+
+def _substitute_strings(value: Any, pattern: re.Pattern[str], replacements: dict[str, str]) -> Any:
+    """Copy of `value` with `pattern` substituted inside its string values (keys untouched)."""
+    if isinstance(value, str):
+        return pattern.sub(lambda match: replacements[match.group(0)], value)
+    if isinstance(value, dict):
+        return {key: _substitute_strings(item, pattern, replacements) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_substitute_strings(item, pattern, replacements) for item in value]
+    return value
+
+
+def _specialize_response(result: Any, cached_entities: dict[str, Any], entities: dict[str, Any]) -> Any:
+    """
+    Adapt a semantically cached playbook to the current deal by swapping the cached
+    deal's competitor name and price amounts for this deal's.
+
+    Prices are only swapped when both deals mention the same number of them, the only
+    case where pairing them by order of appearance is meaningful.
+    """
+    replacements: dict[str, str] = {}
+    old_competitor, new_competitor = cached_entities.get("competitor"), entities.get("competitor")
+    if old_competitor and new_competitor and old_competitor != new_competitor:
+        replacements[old_competitor] = new_competitor
+    old_prices, new_prices = cached_entities.get("prices", []), entities.get("prices", [])
+    if len(old_prices) == len(new_prices):
+        for old_price, new_price in zip(old_prices, new_prices):
+            if old_price != new_price:
+                replacements.setdefault(old_price, new_price)
+    if not replacements:
+        return result
+    pattern = _replacement_pattern(tuple(sorted(replacements, key=len, reverse=True)))
+    return _substitute_strings(result, pattern, replacements)
+
+
+# Static playbook content, built once at import and shared by every call
+_BASE_BEST_PRACTICES = (
+    "Document all pricing discussions in CRM within 24 hours",
+    "Require written confirmation for all verbal agreements",
+    "Establish clear escalation paths before issues arise",
+    "Conduct weekly deal reviews for deals over $200K",
+    "Implement automated deal health scoring and alerts",
+    "Create competitive battle cards for common competitors",
+    "Establish standard pricing approval workflows",
+    "Require technical validation before pricing commitment",
+)
+
+_DEFAULT_WHAT_WENT_WRONG = (
+    "Pricing ambiguity led to multiple renegotiations",
+    "Communication breakdown between sales and customer",
+    "Competitive pressure not addressed early enough",
+    "Delivery timeline expectations were misaligned",
+    "Missing written confirmations for key agreements",
+    "Budget qualification occurred too late in sales cycle",
+    "Technical requirements not fully understood before pricing",
+    "Executive sponsorship was not secured early enough",
+    "Insufficient competitive differentiation communicated",
+    "Timeline delays caused resource conflicts",
+)
+
+_DEFAULT_RED_FLAGS = (
+    "Multiple pricing discussions without written confirmation",
+    "Vague timeline references instead of specific dates",
+    "Customer mentioned evaluating alternatives",
+    "Delayed responses to critical questions",
+    "No documented approval process visible",
+    "Verbal agreements without written follow-up",
+    "Pricing negotiations stalled multiple times",
+    "Competitor explicitly mentioned during negotiations",
+    "Discounts mentioned verbally without confirmation",
+    "Missing warranty or penalty clauses in documentation",
+)
+
+# Fields a recommendation falls back to when the LLM omits them
+_DEFAULT_REC_FIELDS = MappingProxyType({"priority": "Med", "action": "Review deal process", "impact": 5, "owner": "Sales Rep"})
+
+_DEFAULT_RECOMMENDATIONS = (
+    Recommendation("High", "Implement budget qualification in discovery phase", 9, "Sales Rep"),
+    Recommendation("High", "Send written summary after each pricing discussion", 8, "Sales Rep"),
+    Recommendation("High", "Create competitive differentiation matrix", 8, "Sales Manager"),
+    Recommendation("High", "Establish executive sponsorship early in sales cycle", 8, "Sales Manager"),
+    Recommendation("Med", "Establish regular check-in cadence", 7, "Sales Rep"),
+    Recommendation("Med", "Define warranty and penalty clauses early", 7, "Sales Manager"),
+    Recommendation("Med", "Conduct technical validation before pricing commitment", 7, "Sales Engineer"),
+    Recommendation("Low", "Document all verbal agreements in CRM", 6, "Sales Rep"),
+    Recommendation("Low", "Create deal review checklist for high-value opportunities", 6, "Sales Manager"),
+    Recommendation("Low", "Require written confirmation for all discount discussions", 6, "Sales Rep"),
+)
+
+_DEFAULT_BEST_PRACTICES = (
+    "Use CRM to track all deal communications and agreements",
+    "Create standard contract templates with warranty clauses",
+    "Establish documented approval flows for pricing exceptions",
+    "Conduct regular deal reviews for high-value opportunities",
+    "Reduce reliance on verbal commitments",
+    "Implement early warning system for at-risk deals",
+    "Require technical validation before pricing commitment",
+    "Establish competitive intelligence gathering process",
+    "Define penalty clauses for delays in all contracts",
+    "Require written confirmation for all verbal agreements within 24 hours",
+)
+
+
+# Insights for an empty document
+_NO_INSIGHTS: Mapping[str, tuple[Any, ...]] = MappingProxyType({})
+
+
+@lru_cache(maxsize=128)
+def _document_insights(document: str) -> Mapping[str, tuple[Any, ...]]:
+    """
+    Extract document-specific insights from raw document text.
+
+    Cached per document text, so retries and re-renders of the same deal skip the scan;
+    the returned mapping and its tuples are read-only.
+    """
+    if not document:
+        return _NO_INSIGHTS
+
+    doc_lower = document.lower()
+    matched = {keyword for keyword in _INSIGHT_KEYWORDS if keyword in doc_lower}
+    insights = {
+        "what_went_wrong": [],
+        "red_flags": [],
+        "recommendations": [],
+        "best_practices": []
+    }
+
+    # Extract pricing issues
+    pricing_mentions = len(_PRICING_RE.findall(doc_lower))
+    if pricing_mentions > 2:
+        # Extract specific pricing amounts
+        price_matches = _extract_prices(document)
+        price_context = ""
+        if price_matches:
+            price_context = f" (pricing discussed: {', '.join(price_matches[:3])})"
+
+        insights["what_went_wrong"].append(f"Pricing was discussed {pricing_mentions} times indicating unclear initial pricing requirements{price_context}")
+        insights["red_flags"].append("Multiple pricing discussions without written confirmation")
+        insights["recommendations"].append(Recommendation(
+            priority="High",
+            action="Implement budget qualification checklist in discovery phase to avoid pricing renegotiations",
+            impact=9,
+            owner="Sales Rep",
+        ))
+
+    # Extract pricing gap
+    if "pricing gap" in matched or "budget gap" in matched:
+        gap_match = _GAP_RE.search(document)
+        gap_info = f" ({gap_match.group(1)})" if gap_match else ""
+        insights["what_went_wrong"].append(f"Significant pricing gap between proposal and customer budget{gap_info}")
+        insights["red_flags"].append("Budget constraints not properly qualified early in sales cycle")
+
+    # Extract competitor mentions (improved - more precise)
+    competitor_name = _extract_competitor_name(document)
+
+    if competitor_name or "competitor" in matched:
+        comp_name = competitor_name or "a competitor"
+        insights["what_went_wrong"].append(f"Competitive pressure from {comp_name} not addressed early enough")
+        insights["red_flags"].append(f"Competitor {comp_name} explicitly mentioned during negotiations")
+        insights["recommendations"].append(Recommendation(
+            priority="High",
+            action=f"Create competitive differentiation matrix to address {comp_name} early in sales cycle",
+            impact=8,
+            owner="Sales Manager",
+        ))
+
+    # Extract delivery/timeline issues
+    if "delay" in matched or "timeline" in matched or "delivery" in matched:
+        if "vague" in matched or "tbd" in matched or "flexible" in matched or "q2" in matched or "q3" in matched:
+            insights["what_went_wrong"].append("Vague delivery timeline expectations led to misalignment")
+            insights["red_flags"].append("Delivery timeline mentioned without specific dates (e.g., 'Q2', 'flexible')")
+            insights["recommendations"].append(Recommendation(
+                priority="Med",
+                action="Define delivery timeline with specific dates and penalty clauses",
+                impact=7,
+                owner="Sales Manager",
+            ))
+        elif "delay" in matched:
+            delay_match = _DELAY_RE.search(doc_lower)
+            delay_info = f" ({delay_match.group(1)})" if delay_match else ""
+            insights["what_went_wrong"].append(f"Delivery delays occurred{delay_info}")
+            insights["red_flags"].append("Timeline delays indicate poor planning or resource allocation")
+
+    # Extract communication issues
+    if "delayed response" in matched or "no response" in matched or "miscommunication" in matched:
+        insights["what_went_wrong"].append("Communication breakdown between sales and customer")
+        insights["red_flags"].append("Delayed responses to critical questions")
+        insights["recommendations"].append(Recommendation(
+            priority="Med",
+            action="Establish regular check-in cadence to prevent communication delays",
+            impact=7,
+            owner="Sales Rep",
+        ))
+
+    # Extract documentation issues
+    if "verbal" in matched and ("agreement" in matched or "commitment" in matched or "discount" in matched):
+        insights["what_went_wrong"].append("Verbal-only commitments without written confirmation")
+        insights["red_flags"].append("Verbal agreements without written follow-up")
+        insights["recommendations"].append(Recommendation(
+            priority="High",
+            action="Require written confirmation for all verbal agreements within 24 hours",
+            impact=8,
+            owner="Sales Rep",
+        ))
+
+    # Extract escalation issues
+    if "escalation" in matched or "escalated" in matched:
+        insights["what_went_wrong"].append("Multiple escalation phases indicate unresolved issues that should have been addressed earlier")
+        insights["red_flags"].append("Issues escalated multiple times without resolution")
+        insights["recommendations"].append(Recommendation(
+            priority="Med",
+            action="Establish clear escalation paths and resolution processes before issues arise",
+            impact=7,
+            owner="Sales Manager",
+        ))
+
+    # Extract warranty/penalty issues
+    if "warranty" not in matched and "guarantee" not in matched:
+        insights["red_flags"].append("Missing warranty or guarantee terms in deal documentation")
+        insights["recommendations"].append(Recommendation(
+            priority="Med",
+            action="Include warranty and guarantee terms in all proposals",
+            impact=6,
+            owner="Sales Manager",
+        ))
+
+    if "penalty" not in matched and "consequence" not in matched:
+        insights["red_flags"].append("No penalty clauses defined for delays or non-compliance")
+        insights["recommendations"].append(Recommendation(
+            priority="Med",
+            action="Define penalty clauses for delays in all contracts",
+            impact=6,
+            owner="Sales Manager",
+        ))
+
+    # Extract timeline/date issues
+    if any(pattern in matched for pattern in _VAGUE_DATE_KEYWORDS):
+        insights["red_flags"].append("Vague timeline references instead of specific dates")
+
+    # Freeze the result: it is shared by every caller that analyzes the same text
+    return MappingProxyType({section: tuple(items) for section, items in insights.items()})
+
 
 @dataclass
 class PlaybookAgent(BaseAgent):
@@ -104,7 +619,8 @@ class PlaybookAgent(BaseAgent):
             deal_summary: Summary of the deal
             timeline: Timeline analysis from Timeline Agent
             comparative: Comparative analysis from Comparative Agent
-            raw_document: Raw document text for document-specific analysis
+            raw_document: Raw document text for document-specific analysis (only the first
+                6000 characters are used, for the prompt and the heuristics alike)
             
         Returns:
             Dictionary with:
@@ -113,526 +629,445 @@ class PlaybookAgent(BaseAgent):
             - recommendations: List of 8-12 prioritized action items
             - best_practices: List of 6-10 process improvements
         """
-        # Extract document-specific insights FIRST
-        doc_insights = self._extract_document_insights(raw_document)
+        # Bound all downstream text work to the slice the prompt uses
+        raw_document = raw_document[:6000] if raw_document else ""
         
-        prompt = PROMPT_TEMPLATE.format(
-            raw_document=raw_document[:6000] if raw_document else deal_summary[:3000],
-            deal_summary=deal_summary[:2000],
-            timeline=json.dumps(timeline, ensure_ascii=False)[:4000],
-            comparative=json.dumps(comparative, ensure_ascii=False)[:4000],
-        )
+        key = self._cache_key(deal_summary, timeline, comparative, raw_document)
         
         try:
-            result = generate_json(prompt)
-            
-            if not isinstance(result, dict):
-                result = {}
-            
-            # ========== WHAT WENT WRONG (6-10 items) ==========
-            what_went_wrong = result.get("what_went_wrong", [])
-            if not isinstance(what_went_wrong, list):
-                what_went_wrong = []
-            
-            # Add document-specific insights
-            what_went_wrong.extend(doc_insights.get("what_went_wrong", []))
-            
-            # Ensure we have AT LEAST 6 items
-            while len(what_went_wrong) < 6:
-                additional = self._generate_additional_root_causes(timeline, comparative, raw_document)
-                what_went_wrong.extend(additional)
-                if not additional:  # If no more can be generated, use defaults
-                    break
-            
-            # Fill to minimum if still not enough
-            if len(what_went_wrong) < 6:
-                what_went_wrong.extend(self._get_default_what_went_wrong()[:6-len(what_went_wrong)])
-            
-            result["what_went_wrong"] = list(dict.fromkeys(what_went_wrong))[:10]  # Remove duplicates, limit to 10
-            
-            # ========== RED FLAGS (6-10 items) ==========
-            red_flags = result.get("red_flags", [])
-            if not isinstance(red_flags, list):
-                red_flags = []
-            
-            # Add document-specific red flags
-            red_flags.extend(doc_insights.get("red_flags", []))
-            
-            # Ensure we have AT LEAST 6 items
-            while len(red_flags) < 6:
-                additional = self._generate_additional_red_flags(timeline, comparative, raw_document)
-                red_flags.extend(additional)
-                if not additional:
-                    break
-            
-            # Fill to minimum if still not enough
-            if len(red_flags) < 6:
-                red_flags.extend(self._get_default_red_flags()[:6-len(red_flags)])
-            
-            result["red_flags"] = list(dict.fromkeys(red_flags))[:10]
-            
-            # ========== RECOMMENDATIONS (8-12 items) ==========
-            recommendations = result.get("recommendations", [])
-            if not isinstance(recommendations, list):
-                recommendations = []
-            
-            # Add document-specific recommendations
-            recommendations.extend(doc_insights.get("recommendations", []))
-            
-            # Ensure we have AT LEAST 8 items
-            while len(recommendations) < 8:
-                additional = self._generate_additional_recommendations(timeline, comparative, raw_document)
-                recommendations.extend(additional)
-                if not additional:
-                    break
-            
-            # Fill to minimum if still not enough
-            if len(recommendations) < 8:
-                recommendations.extend(self._get_default_recommendations()[:8-len(recommendations)])
-            
-            # Validate all recommendations have required fields
-            validated_recs = []
-            for rec in recommendations[:12]:
-                if isinstance(rec, dict):
-                    validated_recs.append({
-                        "priority": rec.get("priority", "Med"),
-                        "action": rec.get("action", "Review deal process"),
-                        "impact": int(rec.get("impact", 5)),
-                        "owner": rec.get("owner", "Sales Rep")
-                    })
-                elif isinstance(rec, str):
-                    validated_recs.append({
-                        "priority": "Med",
-                        "action": rec,
-                        "impact": 6,
-                        "owner": "Sales Rep"
-                    })
-            
-            result["recommendations"] = validated_recs[:12]
-            
-            # ========== BEST PRACTICES (6-10 items) ==========
-            best_practices = result.get("best_practices", [])
-            if not isinstance(best_practices, list):
-                best_practices = []
-            
-            # Add document-specific best practices
-            best_practices.extend(doc_insights.get("best_practices", []))
-            
-            # Ensure we have AT LEAST 6 items
-            while len(best_practices) < 6:
-                additional = self._generate_additional_best_practices(raw_document)
-                best_practices.extend(additional)
-                if not additional:
-                    break
-            
-            # Fill to minimum if still not enough
-            if len(best_practices) < 6:
-                best_practices.extend(self._get_default_best_practices()[:6-len(best_practices)])
-            
-            result["best_practices"] = list(dict.fromkeys(best_practices))[:10]
-            
-            return result
-            
-        except Exception as e:
+            if key and _llm_cache.failed(key):
+                # The same request failed moments ago; don't hit the provider again yet
+                return self._generate_document_specific_playbook(timeline, comparative, raw_document)
+            result = _llm_cache.get(key) if key else None
+            context = None
+            if result is None:
+                # Mine the document on this thread while the LLM request is in flight
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    pending = executor.submit(
+                        self._semantic_or_generate, deal_summary, timeline, comparative, raw_document
+                    )
+                    context = self._document_context(raw_document, timeline)
+                    result = pending.result()
+                if key and _cacheable(result):
+                    _llm_cache.set(key, result)
+            return self._finalize(result, timeline, comparative, raw_document, context)
+        except Exception:
+            if key:
+                _llm_cache.set_error(key)
             # Return document-specific fallback
             return self._generate_document_specific_playbook(timeline, comparative, raw_document)
     
-    def _extract_document_insights(self, document: str) -> dict[str, Any]:
-        """
-        Extract document-specific insights from raw document text.
+    async def analyze_async(
+        self, deal_summary: str, timeline: dict[str, Any], comparative: dict[str, Any], raw_document: str = ""
+    ) -> dict[str, Any]:
+        """Async variant of `analyze`; awaits the LLM call so several deals can overlap."""
+        raw_document = raw_document[:6000] if raw_document else ""
+        key = self._cache_key(deal_summary, timeline, comparative, raw_document)
         
-        Args:
-            document: Raw document text
-            
-        Returns:
-            Dictionary with extracted insights
+        try:
+            if key and _llm_cache.failed(key):
+                return self._generate_document_specific_playbook(timeline, comparative, raw_document)
+            result = _llm_cache.get(key) if key else None
+            if result is None:
+                result = await self._semantic_or_generate_async(deal_summary, timeline, comparative, raw_document)
+                if key and _cacheable(result):
+                    _llm_cache.set(key, result)
+            return self._finalize(result, timeline, comparative, raw_document)
+        except Exception:
+            if key:
+                _llm_cache.set_error(key)
+            return self._generate_document_specific_playbook(timeline, comparative, raw_document)
+    
+    async def analyze_many(self, deals: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """
-        if not document:
-            return {}
-        
-        doc_lower = document.lower()
-        insights = {
-            "what_went_wrong": [],
-            "red_flags": [],
-            "recommendations": [],
-            "best_practices": []
-        }
+        Run `analyze_async` for several deals concurrently so their LLM round-trips overlap.
         
-        # Extract pricing issues
-        pricing_mentions = len(re.findall(r"\bpricing\b|\bprice\b|\bbudget\b|\bcost\b", doc_lower))
-        if pricing_mentions > 2:
-            # Extract specific pricing amounts
-            price_matches = re.findall(r"\$[\d,]+|\d+[\d,]*\s*(?:k|thousand|million)", document, re.IGNORECASE)
-            price_context = ""
-            if price_matches:
-                price_context = f" (pricing discussed: {', '.join(price_matches[:3])})"
-            
-            insights["what_went_wrong"].append(f"Pricing was discussed {pricing_mentions} times indicating unclear initial pricing requirements{price_context}")
-            insights["red_flags"].append("Multiple pricing discussions without written confirmation")
-            insights["recommendations"].append({
-                "priority": "High",
-                "action": "Implement budget qualification checklist in discovery phase to avoid pricing renegotiations",
-                "impact": 9,
-                "owner": "Sales Rep"
+        Each item holds the `analyze` keyword arguments (deal_summary, timeline, comparative,
+        and optionally raw_document). Results keep the input order.
+        """
+        return list(await asyncio.gather(*(self.analyze_async(**deal) for deal in deals)))
+    
+    def _cache_key(
+        self, deal_summary: str, timeline: dict[str, Any], comparative: dict[str, Any], raw_document: str
+    ) -> str | None:
+        if not get_settings().llm_cache_enabled:
+            return None
+        try:
+            return LLMCache.cache_key({
+                "model": DEFAULT_MODEL,
+                "raw": raw_document,
+                "sum": deal_summary[:2000],
+                "tl": timeline,
+                "cmp": comparative,
             })
+        except TypeError:
+            return None  # Inputs not JSON-serializable; skip the cache
+    
+    def _document_context(
+        self, raw_document: str, timeline: dict[str, Any]
+    ) -> tuple[set[str], EventSummary, Mapping[str, tuple[Any, ...]]]:
+        """Generator keywords present, timeline signal counts and document insights; independent of the LLM."""
+        # Scan the document and count timeline signals once; every helper reuses them
+        terms = _generator_terms(raw_document)
+        return terms, _summarize_events(timeline), self._extract_document_insights(raw_document)
+    
+    def _finalize(
+        self,
+        result: Any,
+        timeline: dict[str, Any],
+        comparative: dict[str, Any],
+        raw_document: str,
+        context: tuple[set[str], EventSummary, Mapping[str, tuple[Any, ...]]] | None = None,
+    ) -> dict[str, Any]:
+        """Merge the LLM sections with document-specific insights and top each one up to its minimum."""
+        if context is None:
+            context = self._document_context(raw_document, timeline)
+        terms, summary, doc_insights = context
         
-        # Extract pricing gap
-        if "pricing gap" in doc_lower or "budget gap" in doc_lower:
-            gap_match = re.search(r"gap[:\s]+(\$?[\d,]+|\d+%)", document, re.IGNORECASE)
-            gap_info = f" ({gap_match.group(1)})" if gap_match else ""
-            insights["what_went_wrong"].append(f"Significant pricing gap between proposal and customer budget{gap_info}")
-            insights["red_flags"].append("Budget constraints not properly qualified early in sales cycle")
-        
-        # Extract competitor mentions (improved - more precise)
-        competitor_patterns = [
-            r"lost to ([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){0,2})",  # Company name (1-3 words, capitalized)
-            r"competitor[:\s]+([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){0,2})",  # More precise
-            r"alternative vendor[:\s]+([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){0,2})",
-            r"([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){0,2})\s+(?:solutions|systems|technologies|corp|inc|llc|ltd)",
-            r"([A-Z][a-zA-Z]+)\s+(?:solutions|systems|technologies)",  # Single word + solutions
-        ]
-        
-        competitor_name = ""
-        for pattern in competitor_patterns:
-            match = re.search(pattern, document, re.IGNORECASE)
-            if match:
-                competitor_name = match.group(1).strip()
-                # Clean up common words
-                competitor_name = re.sub(r'\b(was|is|the|a|an|vendor|solution|company|due|to|pricing|concerns|and|delivery|timeline)\b', '', competitor_name, flags=re.IGNORECASE).strip()
-                # Remove extra spaces
-                competitor_name = re.sub(r'\s+', ' ', competitor_name).strip()
-                # Limit to reasonable length (30 chars for company name)
-                if 3 < len(competitor_name) <= 30:
-                    break
-                elif len(competitor_name) > 30:
-                    # Take first 2 words if too long
-                    words = competitor_name.split()[:2]
-                    competitor_name = ' '.join(words)
-                    if len(competitor_name) <= 30:
-                        break
-                    else:
-                        competitor_name = ""
-        
-        if competitor_name or "competitor" in doc_lower:
-            comp_name = competitor_name or "a competitor"
-            insights["what_went_wrong"].append(f"Competitive pressure from {comp_name} not addressed early enough")
-            insights["red_flags"].append(f"Competitor {comp_name} explicitly mentioned during negotiations")
-            insights["recommendations"].append({
-                "priority": "High",
-                "action": f"Create competitive differentiation matrix to address {comp_name} early in sales cycle",
-                "impact": 8,
-                "owner": "Sales Manager"
-            })
+        if not isinstance(result, dict):
+            result = {}
         
-        # Extract delivery/timeline issues
-        if "delay" in doc_lower or "timeline" in doc_lower or "delivery" in doc_lower:
-            if "vague" in doc_lower or "tbd" in doc_lower or "flexible" in doc_lower or "q2" in doc_lower or "q3" in doc_lower:
-                insights["what_went_wrong"].append("Vague delivery timeline expectations led to misalignment")
-                insights["red_flags"].append("Delivery timeline mentioned without specific dates (e.g., 'Q2', 'flexible')")
-                insights["recommendations"].append({
+        # Each section: LLM items + document-specific items, topped up from the deterministic
+        # generator (one call suffices) and then the defaults, deduplicated and capped
+        result["what_went_wrong"] = _top_up_section(
+            result.get("what_went_wrong"),
+            doc_insights.get("what_went_wrong", []),
+            lambda: self._generate_additional_root_causes(timeline, comparative, raw_document, terms, summary),
+            self._get_default_what_went_wrong(),
+            minimum=6,
+            cap=10,
+        )
+        result["red_flags"] = _top_up_section(
+            result.get("red_flags"),
+            doc_insights.get("red_flags", []),
+            lambda: self._generate_additional_red_flags(timeline, comparative, raw_document, terms, summary),
+            self._get_default_red_flags(),
+            minimum=6,
+            cap=10,
+        )
+        recommendations = _top_up_section(
+            result.get("recommendations"),
+            doc_insights.get("recommendations", []),
+            lambda: self._generate_additional_recommendations(timeline, comparative, raw_document, terms, summary),
+            self._get_default_recommendations(),
+            minimum=8,
+            cap=12,
+            key=_action_key,
+        )
+        
+        # Validate all recommendations have required fields
+        validated_recs = []
+        for rec in recommendations:
+            kind = type(rec)
+            if kind is Recommendation:
+                validated_recs.append(rec._asdict())
+            elif kind is dict:
+                fields = {**_DEFAULT_REC_FIELDS, **rec}
+                validated_recs.append({
+                    "priority": fields["priority"],
+                    "action": fields["action"],
+                    "impact": int(fields["impact"]),
+                    "owner": fields["owner"]
+                })
+            elif kind is str:
+                validated_recs.append({
                     "priority": "Med",
-                    "action": "Define delivery timeline with specific dates and penalty clauses",
-                    "impact": 7,
-                    "owner": "Sales Manager"
+                    "action": rec,
+                    "impact": 6,
+                    "owner": "Sales Rep"
                 })
-            elif "delay" in doc_lower:
-                delay_match = re.search(r"delay[ed]?\s+(?:of|for)?\s*(\d+\s*(?:days?|weeks?|months?))", doc_lower)
-                delay_info = f" ({delay_match.group(1)})" if delay_match else ""
-                insights["what_went_wrong"].append(f"Delivery delays occurred{delay_info}")
-                insights["red_flags"].append("Timeline delays indicate poor planning or resource allocation")
-        
-        # Extract communication issues
-        if "delayed response" in doc_lower or "no response" in doc_lower or "miscommunication" in doc_lower:
-            insights["what_went_wrong"].append("Communication breakdown between sales and customer")
-            insights["red_flags"].append("Delayed responses to critical questions")
-            insights["recommendations"].append({
-                "priority": "Med",
-                "action": "Establish regular check-in cadence to prevent communication delays",
-                "impact": 7,
-                "owner": "Sales Rep"
-            })
         
-        # Extract documentation issues
-        if "verbal" in doc_lower and ("agreement" in doc_lower or "commitment" in doc_lower or "discount" in doc_lower):
-            insights["what_went_wrong"].append("Verbal-only commitments without written confirmation")
-            insights["red_flags"].append("Verbal agreements without written follow-up")
-            insights["recommendations"].append({
-                "priority": "High",
-                "action": "Require written confirmation for all verbal agreements within 24 hours",
-                "impact": 8,
-                "owner": "Sales Rep"
-            })
+        result["recommendations"] = validated_recs
         
-        # Extract escalation issues
-        if "escalation" in doc_lower or "escalated" in doc_lower:
-            insights["what_went_wrong"].append("Multiple escalation phases indicate unresolved issues that should have been addressed earlier")
-            insights["red_flags"].append("Issues escalated multiple times without resolution")
-            insights["recommendations"].append({
-                "priority": "Med",
-                "action": "Establish clear escalation paths and resolution processes before issues arise",
-                "impact": 7,
-                "owner": "Sales Manager"
-            })
+        result["best_practices"] = _top_up_section(
+            result.get("best_practices"),
+            doc_insights.get("best_practices", []),
+            lambda: self._generate_additional_best_practices(raw_document, terms),
+            self._get_default_best_practices(),
+            minimum=6,
+            cap=10,
+        )
         
-        # Extract warranty/penalty issues
-        if "warranty" not in doc_lower and "guarantee" not in doc_lower:
-            insights["red_flags"].append("Missing warranty or guarantee terms in deal documentation")
-            insights["recommendations"].append({
-                "priority": "Med",
-                "action": "Include warranty and guarantee terms in all proposals",
-                "impact": 6,
-                "owner": "Sales Manager"
-            })
+        return result
+    
+    def _build_prompt(
+        self, deal_summary: str, timeline: dict[str, Any], comparative: dict[str, Any], raw_document: str
+    ) -> str:
+        return _render_prompt(
+            raw_document=raw_document or deal_summary[:3000],
+            deal_summary=deal_summary[:2000],
+            timeline=_fastjson(timeline)[:4000],
+            comparative=_fastjson(comparative)[:4000],
+        )
+    
+    def _semantic_lookup(
+        self, deal_summary: str, timeline: dict[str, Any], comparative: dict[str, Any], raw_document: str
+    ) -> tuple[Any, str | None, list[float] | None, dict[str, Any] | None]:
+        """
+        Near-duplicate answer from the semantic cache (or None), plus the skeleton/vector/entities
+        to store a miss under; all None when LLM caching is disabled.
+        """
+        if not get_settings().llm_cache_enabled:
+            return None, None, None, None
+        document = raw_document or deal_summary
+        skeleton = _loss_skeleton(document, timeline, comparative)
+        entities = {"competitor": _extract_competitor_name(document), "prices": _extract_prices(document)[:10]}
+        vector = _slot_embedder.embed_query(f"{raw_document}\n{deal_summary[:2000]}")
         
-        if "penalty" not in doc_lower and "consequence" not in doc_lower:
-            insights["red_flags"].append("No penalty clauses defined for delays or non-compliance")
-            insights["recommendations"].append({
-                "priority": "Med",
-                "action": "Define penalty clauses for delays in all contracts",
-                "impact": 6,
-                "owner": "Sales Manager"
-            })
+        hit = _semantic_cache.lookup(skeleton, vector)
+        if hit is not None:
+            cached, cached_entities = hit
+            return _specialize_response(cached, cached_entities, entities), skeleton, vector, entities
+        return None, skeleton, vector, entities
+    
+    def _semantic_or_generate(
+        self, deal_summary: str, timeline: dict[str, Any], comparative: dict[str, Any], raw_document: str
+    ) -> Any:
+        """
+        Serve a near-duplicate deal from the semantic cache, otherwise call the LLM and remember it.
         
-        # Extract timeline/date issues
-        vague_date_patterns = ["q1", "q2", "q3", "q4", "sometime", "flexible", "tbd", "to be determined"]
-        if any(pattern in doc_lower for pattern in vague_date_patterns):
-            insights["red_flags"].append("Vague timeline references instead of specific dates")
+        The prompt (and the JSON encoding of timeline/comparative inside it) is only built on a miss.
+        """
+        hit, skeleton, vector, entities = self._semantic_lookup(deal_summary, timeline, comparative, raw_document)
+        if hit is not None:
+            return hit
         
-        return insights
+        result = generate_json(
+            self._build_prompt(deal_summary, timeline, comparative, raw_document),
+            system_instruction=SYSTEM_INSTRUCTIONS,
+        )
+        if vector is not None and _cacheable(result):
+            _semantic_cache.add(skeleton, vector, result, entities)
+        return result
     
-    def _generate_additional_root_causes(self, timeline: dict, comparative: dict, raw_document: str = "") -> list[str]:
-        """Generate additional root causes based on timeline, comparative data, and document."""
-        causes = []
+    async def _semantic_or_generate_async(
+        self, deal_summary: str, timeline: dict[str, Any], comparative: dict[str, Any], raw_document: str
+    ) -> Any:
+        """Async variant of `_semantic_or_generate`."""
+        hit, skeleton, vector, entities = self._semantic_lookup(deal_summary, timeline, comparative, raw_document)
+        if hit is not None:
+            return hit
         
+        result = await generate_json_async(
+            self._build_prompt(deal_summary, timeline, comparative, raw_document),
+            system_instruction=SYSTEM_INSTRUCTIONS,
+        )
+        if vector is not None and _cacheable(result):
+            _semantic_cache.add(skeleton, vector, result, entities)
+        return result
+    
+    def _extract_document_insights(self, document: str) -> Mapping[str, tuple[Any, ...]]:
+        """
+        Extract document-specific insights from raw document text.
+        
+        Args:
+            document: Raw document text
+            
+        Returns:
+            Read-only mapping of section name to insight items (cached per document)
+        """
+        return _document_insights(document)
+    
+    def _generate_additional_root_causes(
+        self,
+        timeline: dict,
+        comparative: dict,
+        raw_document: str = "",
+        terms: set[str] | None = None,
+        summary: EventSummary | None = None,
+    ) -> Iterator[str]:
+        """Generate additional root causes based on timeline, comparative data, and document."""
         # Check for pricing issues
         if comparative.get("pricing_delta", 0) > 0.5:
-            causes.append("Significant pricing gap between proposal and customer budget indicates unclear requirements gathering")
+            yield "Significant pricing gap between proposal and customer budget indicates unclear requirements gathering"
         
         # Check for competitor issues
         if comparative.get("competitor_risk", 0) > 0.6:
-            causes.append("High competitive pressure suggests insufficient differentiation or value communication")
+            yield "High competitive pressure suggests insufficient differentiation or value communication"
+        
+        if summary is None:
+            summary = _summarize_events(timeline)
         
         # Check timeline for delays
-        events = timeline.get("events", [])
-        if events:
-            negative_events = [e for e in events if isinstance(e, dict) and e.get("sentiment") == "negative"]
-            if len(negative_events) > len(events) * 0.4:
-                causes.append("High proportion of negative sentiment events indicates communication or expectation misalignment")
+        if summary.total:
+            if summary.negative > summary.total * 0.4:
+                yield "High proportion of negative sentiment events indicates communication or expectation misalignment"
         
         # Check for escalation issues
-        escalation_phases = [e for e in events if isinstance(e, dict) and "escalation" in e.get("phase", "").lower()]
-        if escalation_phases:
-            causes.append("Multiple escalation phases indicate unresolved issues that should have been addressed earlier")
+        if summary.escalation:
+            yield "Multiple escalation phases indicate unresolved issues that should have been addressed earlier"
         
         # Document-specific checks
         if raw_document:
-            doc_lower = raw_document.lower()
-            if "warranty" not in doc_lower and "guarantee" not in doc_lower:
-                causes.append("Missing warranty or guarantee terms in deal documentation")
-            if "penalty" not in doc_lower and "consequence" not in doc_lower:
-                causes.append("No penalty clauses defined for delays or non-compliance")
-            if "written" not in doc_lower or "documented" not in doc_lower:
-                causes.append("Insufficient written documentation throughout the deal process")
-        
-        return causes
+            if terms is None:
+                terms = _generator_terms(raw_document)
+            if "warranty" not in terms and "guarantee" not in terms:
+                yield "Missing warranty or guarantee terms in deal documentation"
+            if "penalty" not in terms and "consequence" not in terms:
+                yield "No penalty clauses defined for delays or non-compliance"
+            if "written" not in terms or "documented" not in terms:
+                yield "Insufficient written documentation throughout the deal process"
     
-    def _generate_additional_red_flags(self, timeline: dict, comparative: dict, raw_document: str = "") -> list[str]:
+    def _generate_additional_red_flags(
+        self,
+        timeline: dict,
+        comparative: dict,
+        raw_document: str = "",
+        terms: set[str] | None = None,
+        summary: EventSummary | None = None,
+    ) -> Iterator[str]:
         """Generate additional red flags based on analysis."""
-        flags = []
+        if summary is None:
+            summary = _summarize_events(timeline)
         
         # Check for vague timelines
-        events = timeline.get("events", [])
-        if events:
-            vague_timestamps = [e for e in events if isinstance(e, dict) and ("week" in str(e.get("timestamp", "")).lower() or "month" in str(e.get("timestamp", "")).lower())]
-            if vague_timestamps:
-                flags.append("Vague timeline references (weeks/months) instead of specific dates indicate planning uncertainty")
+        if summary.vague_timestamps:
+            yield "Vague timeline references (weeks/months) instead of specific dates indicate planning uncertainty"
         
         # Check for pricing negotiations
-        pricing_events = [e for e in events if isinstance(e, dict) and "pricing" in e.get("phase", "").lower()]
-        if len(pricing_events) > 2:
-            flags.append("Multiple pricing discussions indicate unclear initial pricing or scope creep")
+        if summary.pricing > 2:
+            yield "Multiple pricing discussions indicate unclear initial pricing or scope creep"
         
         # Check communication quality
-        comm_events = timeline.get("communication_events", [])
-        if comm_events:
-            negative_comm = [c for c in comm_events if isinstance(c, dict) and c.get("sentiment") == "negative"]
-            if len(negative_comm) > len(comm_events) * 0.3:
-                flags.append("High proportion of negative communication events suggests relationship deterioration")
+        if summary.communication_total:
+            if summary.communication_negative > summary.communication_total * 0.3:
+                yield "High proportion of negative communication events suggests relationship deterioration"
         
         # Document-specific checks
         if raw_document:
-            doc_lower = raw_document.lower()
-            if "customer said" in doc_lower or "customer mentioned" in doc_lower:
-                flags.append("Key information only mentioned verbally without written confirmation")
-            if "tbd" in doc_lower or "to be determined" in doc_lower:
-                flags.append("Multiple 'to be determined' items indicate incomplete planning")
-            if "discount" in doc_lower and "verbal" in doc_lower:
-                flags.append("Discounts mentioned verbally without written confirmation")
-        
-        return flags
+            if terms is None:
+                terms = _generator_terms(raw_document)
+            if "customer said" in terms or "customer mentioned" in terms:
+                yield "Key information only mentioned verbally without written confirmation"
+            if "tbd" in terms or "to be determined" in terms:
+                yield "Multiple 'to be determined' items indicate incomplete planning"
+            if "discount" in terms and "verbal" in terms:
+                yield "Discounts mentioned verbally without written confirmation"
     
-    def _generate_additional_recommendations(self, timeline: dict, comparative: dict, raw_document: str = "") -> list[dict]:
+    def _generate_additional_recommendations(
+        self,
+        timeline: dict,
+        comparative: dict,
+        raw_document: str = "",
+        terms: set[str] | None = None,
+        summary: EventSummary | None = None,
+    ) -> Iterator[Recommendation]:
         """Generate additional recommendations based on analysis."""
-        recs = []
-        
         if comparative.get("pricing_delta", 0) > 0.5:
-            recs.append({
-                "priority": "High",
-                "action": "Implement budget qualification checklist in discovery phase",
-                "impact": 9,
-                "owner": "Sales Rep"
-            })
+            yield Recommendation(
+                priority="High",
+                action="Implement budget qualification checklist in discovery phase",
+                impact=9,
+                owner="Sales Rep",
+            )
         
         if comparative.get("competitor_risk", 0) > 0.6:
-            recs.append({
-                "priority": "High",
-                "action": "Create competitive differentiation matrix and share early in sales cycle",
-                "impact": 8,
-                "owner": "Sales Manager"
-            })
+            yield Recommendation(
+                priority="High",
+                action="Create competitive differentiation matrix and share early in sales cycle",
+                impact=8,
+                owner="Sales Manager",
+            )
         
-        events = timeline.get("events", [])
-        if events:
-            negative_count = len([e for e in events if isinstance(e, dict) and e.get("sentiment") == "negative"])
-            if negative_count > 3:
-                recs.append({
-                    "priority": "Med",
-                    "action": "Establish regular check-in cadence to catch issues early",
-                    "impact": 7,
-                    "owner": "Sales Rep"
-                })
+        if summary is None:
+            summary = _summarize_events(timeline)
+        
+        if summary.total:
+            if summary.negative > 3:
+                yield Recommendation(
+                    priority="Med",
+                    action="Establish regular check-in cadence to catch issues early",
+                    impact=7,
+                    owner="Sales Rep",
+                )
         
         # Document-specific recommendations
         if raw_document:
-            doc_lower = raw_document.lower()
-            if "discount" in doc_lower and "verbal" in doc_lower:
-                recs.append({
-                    "priority": "High",
-                    "action": "Require written confirmation for all discount discussions",
-                    "impact": 8,
-                    "owner": "Sales Rep"
-                })
-            if "timeline" in doc_lower and ("vague" in doc_lower or "tbd" in doc_lower):
-                recs.append({
-                    "priority": "Med",
-                    "action": "Define specific delivery dates with penalty clauses",
-                    "impact": 7,
-                    "owner": "Sales Manager"
-                })
-        
-        return recs
+            if terms is None:
+                terms = _generator_terms(raw_document)
+            if "discount" in terms and "verbal" in terms:
+                yield Recommendation(
+                    priority="High",
+                    action="Require written confirmation for all discount discussions",
+                    impact=8,
+                    owner="Sales Rep",
+                )
+            if "timeline" in terms and ("vague" in terms or "tbd" in terms):
+                yield Recommendation(
+                    priority="Med",
+                    action="Define specific delivery dates with penalty clauses",
+                    impact=7,
+                    owner="Sales Manager",
+                )
     
-    def _generate_additional_best_practices(self, raw_document: str = "") -> list[str]:
+    def _generate_additional_best_practices(self, raw_document: str = "", terms: set[str] | None = None) -> Iterator[str]:
         """Generate additional best practices."""
-        practices = [
-            "Document all pricing discussions in CRM within 24 hours",
-            "Require written confirmation for all verbal agreements",
-            "Establish clear escalation paths before issues arise",
-            "Conduct weekly deal reviews for deals over $200K",
-            "Implement automated deal health scoring and alerts",
-            "Create competitive battle cards for common competitors",
-            "Establish standard pricing approval workflows",
-            "Require technical validation before pricing commitment"
-        ]
+        yield from _BASE_BEST_PRACTICES
         
         # Add document-specific practices
         if raw_document:
-            doc_lower = raw_document.lower()
-            if "warranty" not in doc_lower:
-                practices.append("Include warranty and guarantee terms in all proposals")
-            if "penalty" not in doc_lower:
-                practices.append("Define penalty clauses for delays in all contracts")
-            if "crm" not in doc_lower:
-                practices.append("Use CRM to track all deal communications and agreements")
-        
-        return practices
+            if terms is None:
+                terms = _generator_terms(raw_document)
+            if "warranty" not in terms:
+                yield "Include warranty and guarantee terms in all proposals"
+            if "penalty" not in terms:
+                yield "Define penalty clauses for delays in all contracts"
+            if "crm" not in terms:
+                yield "Use CRM to track all deal communications and agreements"
     
-    def _get_default_what_went_wrong(self) -> list[str]:
+    def _get_default_what_went_wrong(self) -> tuple[str, ...]:
         """Get default what went wrong items."""
-        return [
-            "Pricing ambiguity led to multiple renegotiations",
-            "Communication breakdown between sales and customer",
-            "Competitive pressure not addressed early enough",
-            "Delivery timeline expectations were misaligned",
-            "Missing written confirmations for key agreements",
-            "Budget qualification occurred too late in sales cycle",
-            "Technical requirements not fully understood before pricing",
-            "Executive sponsorship was not secured early enough",
-            "Insufficient competitive differentiation communicated",
-            "Timeline delays caused resource conflicts"
-        ]
+        return _DEFAULT_WHAT_WENT_WRONG
     
-    def _get_default_red_flags(self) -> list[str]:
+    def _get_default_red_flags(self) -> tuple[str, ...]:
         """Get default red flags."""
-        return [
-            "Multiple pricing discussions without written confirmation",
-            "Vague timeline references instead of specific dates",
-            "Customer mentioned evaluating alternatives",
-            "Delayed responses to critical questions",
-            "No documented approval process visible",
-            "Verbal agreements without written follow-up",
-            "Pricing negotiations stalled multiple times",
-            "Competitor explicitly mentioned during negotiations",
-            "Discounts mentioned verbally without confirmation",
-            "Missing warranty or penalty clauses in documentation"
-        ]
+        return _DEFAULT_RED_FLAGS
     
-    def _get_default_recommendations(self) -> list[dict]:
+    def _get_default_recommendations(self) -> tuple[Recommendation, ...]:
         """Get default recommendations."""
-        return [
-            {"priority": "High", "action": "Implement budget qualification in discovery phase", "impact": 9, "owner": "Sales Rep"},
-            {"priority": "High", "action": "Send written summary after each pricing discussion", "impact": 8, "owner": "Sales Rep"},
-            {"priority": "High", "action": "Create competitive differentiation matrix", "impact": 8, "owner": "Sales Manager"},
-            {"priority": "High", "action": "Establish executive sponsorship early in sales cycle", "impact": 8, "owner": "Sales Manager"},
-            {"priority": "Med", "action": "Establish regular check-in cadence", "impact": 7, "owner": "Sales Rep"},
-            {"priority": "Med", "action": "Define warranty and penalty clauses early", "impact": 7, "owner": "Sales Manager"},
-            {"priority": "Med", "action": "Conduct technical validation before pricing commitment", "impact": 7, "owner": "Sales Engineer"},
-            {"priority": "Low", "action": "Document all verbal agreements in CRM", "impact": 6, "owner": "Sales Rep"},
-            {"priority": "Low", "action": "Create deal review checklist for high-value opportunities", "impact": 6, "owner": "Sales Manager"},
-            {"priority": "Low", "action": "Require written confirmation for all discount discussions", "impact": 6, "owner": "Sales Rep"}
-        ]
+        return _DEFAULT_RECOMMENDATIONS
     
-    def _get_default_best_practices(self) -> list[str]:
+    def _get_default_best_practices(self) -> tuple[str, ...]:
         """Get default best practices."""
-        return [
-            "Use CRM to track all deal communications and agreements",
-            "Create standard contract templates with warranty clauses",
-            "Establish documented approval flows for pricing exceptions",
-            "Conduct regular deal reviews for high-value opportunities",
-            "Reduce reliance on verbal commitments",
-            "Implement early warning system for at-risk deals",
-            "Require technical validation before pricing commitment",
-            "Establish competitive intelligence gathering process",
-            "Define penalty clauses for delays in all contracts",
-            "Require written confirmation for all verbal agreements within 24 hours"
-        ]
+        return _DEFAULT_BEST_PRACTICES
     
     def _generate_document_specific_playbook(self, timeline: dict, comparative: dict, raw_document: str) -> dict[str, Any]:
         """Generate document-specific playbook when LLM fails."""
+        terms = _generator_terms(raw_document)
+        summary = _summarize_events(timeline)
+        
         # Extract insights from document
         doc_insights = self._extract_document_insights(raw_document)
         
-        # Build playbook from extracted insights
-        what_went_wrong = doc_insights.get("what_went_wrong", [])
-        what_went_wrong.extend(self._generate_additional_root_causes(timeline, comparative, raw_document))
-        what_went_wrong.extend(self._get_default_what_went_wrong())
-        
-        red_flags = doc_insights.get("red_flags", [])
-        red_flags.extend(self._generate_additional_red_flags(timeline, comparative, raw_document))
-        red_flags.extend(self._get_default_red_flags())
-        
-        recommendations = doc_insights.get("recommendations", [])
-        recommendations.extend(self._generate_additional_recommendations(timeline, comparative, raw_document))
-        recommendations.extend(self._get_default_recommendations())
-        
-        best_practices = doc_insights.get("best_practices", [])
-        best_practices.extend(self._generate_additional_best_practices(raw_document))
-        best_practices.extend(self._get_default_best_practices())
+        # Build playbook from extracted insights, then the generators, then the defaults;
+        # each section is consumed lazily and stops once it is full
+        what_went_wrong = chain(
+            doc_insights.get("what_went_wrong", ()),
+            self._generate_additional_root_causes(timeline, comparative, raw_document, terms, summary),
+            self._get_default_what_went_wrong(),
+        )
+        red_flags = chain(
+            doc_insights.get("red_flags", ()),
+            self._generate_additional_red_flags(timeline, comparative, raw_document, terms, summary),
+            self._get_default_red_flags(),
+        )
+        recommendations = chain(
+            doc_insights.get("recommendations", ()),
+            self._generate_additional_recommendations(timeline, comparative, raw_document, terms, summary),
+            self._get_default_recommendations(),
+        )
+        best_practices = chain(
+            doc_insights.get("best_practices", ()),
+            self._generate_additional_best_practices(raw_document, terms),
+            self._get_default_best_practices(),
+        )
         
         # Remove duplicates and ensure correct counts
         return {
-            "what_went_wrong": list(dict.fromkeys(what_went_wrong))[:10],
-            "red_flags": list(dict.fromkeys(red_flags))[:10],
-            "recommendations": recommendations[:12],
-            "best_practices": list(dict.fromkeys(best_practices))[:10]
+            "what_went_wrong": _dedupe_cap(what_went_wrong, 10),
+            "red_flags": _dedupe_cap(red_flags, 10),
+            "recommendations": [
+                rec._asdict() if type(rec) is Recommendation else rec for rec in _dedupe_cap(recommendations, 12, _action_key)
+            ],
+            "best_practices": _dedupe_cap(best_practices, 10)
         }
@@ -14,15 +14,15 @@ This agent:
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable
 import json
 import re
 from datetime import datetime, timedelta
+from operator import itemgetter, le
 from dateutil import parser as date_parser
-from dateutil.relativedelta import relativedelta
 
 from agents.base import BaseAgent
-from core.gemini_client import generate_json
+from core.gemini_client import generate_json, generate_json_async
 
 
 # Standard sales phases
@@ -34,6 +34,9 @@ REQUIRED_PHASES = [
     "Final Decision Phase"
 ]
 
+_REQUIRED_PHASES_SET = frozenset(REQUIRED_PHASES)
+_PHASE_ORDER = {phase: index for index, phase in enumerate(REQUIRED_PHASES)}
+
 # Phase sentiment mapping
 PHASE_SENTIMENT = {
     "Discovery Phase": "neutral",
@@ -55,6 +58,152 @@ EVENT_PATTERNS = {
 }
 
 
+def _pattern_phase(pattern: str) -> str:
+    """Phase an event inferred from `pattern` belongs to."""
+    if "pricing" in pattern or "price" in pattern or "discount" in pattern:
+        return "Pricing Negotiation Phase"
+    if "delivery" in pattern or "implementation" in pattern:
+        return "Delivery Planning Phase"
+    if "escalation" in pattern or "issue" in pattern or "problem" in pattern:
+        return "Issue/Escalation Phase"
+    if "final" in pattern or "decision" in pattern or "outcome" in pattern:
+        return "Final Decision Phase"
+    return "Discovery Phase"
+
+
+_EVENT_PATTERN_PHASES = {
+    pattern: _pattern_phase(pattern) for patterns in EVENT_PATTERNS.values() for pattern in patterns
+}
+_EVENT_NAMES = {event_type: event_type.replace("_", " ").title() for event_type in EVENT_PATTERNS}
+
+# Timestamp substrings that mark a date as vague, and document words that mark the timeline as ambiguous
+_VAGUE_DATE_MARKERS = ("week", "month", "day", "unknown", "tbd")
+_AMBIGUITY_KEYWORDS = ("unclear", "tbd", "to be determined", "unknown", "maybe", "possibly")
+
+# Free-form phase keywords -> canonical phase; earlier entries win when several match
+_PHASE_ROUTING = (
+    (frozenset({"discovery", "initial"}), "Discovery Phase"),
+    (frozenset({"pricing", "price", "negotiation"}), "Pricing Negotiation Phase"),
+    (frozenset({"delivery", "planning"}), "Delivery Planning Phase"),
+    (frozenset({"escalation", "issue", "problem"}), "Issue/Escalation Phase"),
+    (frozenset({"final", "outcome", "decision"}), "Final Decision Phase"),
+)
+
+
+def _clamp01(value: Any, default: float = 0.7) -> float:
+    """Confidence as a float clamped to [0, 1]; `default` when it isn't numeric."""
+    try:
+        number = value if type(value) is float else float(value)
+    except (TypeError, ValueError):
+        return default
+    return 0.0 if number < 0.0 else number if number <= 1.0 else 1.0
+
+
+def _route_phase(phase: str) -> str:
+    """Map a free-form phase name onto one of REQUIRED_PHASES (Discovery Phase if nothing matches)."""
+    phase = phase.lower()
+    for keywords, canonical in _PHASE_ROUTING:
+        if any(keyword in phase for keyword in keywords):
+            return canonical
+    return "Discovery Phase"
+
+
+# Approximate month offsets; date inference doesn't need calendar-month arithmetic
+_ONE_DAY = timedelta(days=1)
+_MONTHS_1 = timedelta(days=30)
+_MONTHS_2 = timedelta(days=60)
+_MONTHS_4 = timedelta(days=120)
+
+# Day range (from deal start) each phase's inferred events fall into
+_PHASE_DAY_RANGES = {
+    "Discovery Phase": (0, 14),
+    "Pricing Negotiation Phase": (14, 35),
+    "Delivery Planning Phase": (35, 50),
+    "Issue/Escalation Phase": (50, 70),
+    "Final Decision Phase": (70, 90),
+}
+
+# Placeholder phase summaries of the fallback / default timelines (copied per result)
+_FALLBACK_PHASE_SUMMARY = {phase: f"Events in {phase}" for phase in REQUIRED_PHASES}
+_DEFAULT_PHASE_SUMMARY = {phase: f"Activity in {phase}" for phase in REQUIRED_PHASES}
+
+# (event_name, description) of the stub events generated for a phase with no extracted events
+_PHASE_STUB_EVENTS = {
+    ("Discovery Phase", "start"): ("Initial Discovery", "Initial contact and requirements gathering started"),
+    ("Discovery Phase", "end"): ("Discovery Complete", "Discovery phase completed, moving to pricing"),
+    ("Pricing Negotiation Phase", "start"): ("Pricing Discussion Begins", "Pricing negotiation phase started"),
+    ("Pricing Negotiation Phase", "end"): ("Pricing Negotiation Complete", "Pricing discussions concluded"),
+    ("Delivery Planning Phase", "start"): ("Delivery Planning Starts", "Implementation and delivery planning began"),
+    ("Delivery Planning Phase", "end"): ("Delivery Planning Complete", "Delivery planning phase completed"),
+    ("Issue/Escalation Phase", "start"): ("Issues Identified", "Problems or concerns raised"),
+    ("Issue/Escalation Phase", "end"): ("Escalation Resolved", "Issues addressed or escalated further"),
+    ("Final Decision Phase", "start"): ("Final Decision Process", "Final decision phase initiated"),
+    ("Final Decision Phase", "end"): ("Final Outcome", "Deal closed - outcome determined"),
+}
+
+# Shapes handled with stdlib datetime before falling back to the (much slower) fuzzy dateutil parser
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_ISO_DATETIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}:\d{2}")
+_US_DATE_RE = re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$")
+
+
+# Relative expressions, tried in order against lowercased text; each maps a match to an offset
+_RELATIVE_PATTERNS: list[tuple[re.Pattern[str], Callable[[re.Match[str]], timedelta]]] = [
+    (re.compile(r"(\d+)\s+days?\s+later"), lambda m: timedelta(days=int(m.group(1)))),
+    (re.compile(r"(\d+)\s+weeks?\s+later"), lambda m: timedelta(weeks=int(m.group(1)))),
+    (re.compile(r"(\d+)\s+months?\s+later"), lambda m: _MONTHS_1 * int(m.group(1))),
+    (re.compile(r"next\s+week"), lambda m: timedelta(weeks=1)),
+    (re.compile(r"next\s+month"), lambda m: _MONTHS_1),
+    (re.compile(r"two\s+days?\s+later"), lambda m: timedelta(days=2)),
+    (re.compile(r"three\s+days?\s+later"), lambda m: timedelta(days=3)),
+]
+
+_MONTH_NUMBERS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2,
+    "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7,
+    "august": 8, "aug": 8, "september": 9, "sep": 9, "sept": 9,
+    "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12
+}
+_DAY_RE = re.compile(r"(\d{1,2})(?:st|nd|rd|th)?")
+
+# dateutil can only find a date in text containing a digit or a month / weekday name
+_DATEUTIL_WORD_RE = re.compile(
+    r"(?<![a-z])("
+    + "|".join(
+        name.lower()
+        for names in date_parser.parserinfo.MONTHS + date_parser.parserinfo.WEEKDAYS
+        for name in names
+    )
+    + r")(?![a-z])"
+)
+
+# Close-date labels, in the priority order used to pick the document's base date
+_CLOSE_DATE_LABELS = ("close date", "closed", "decision date", "final date")
+
+# Every date shape _extract_base_date_from_context looks for, found in a single scan. The
+# alternatives sit in a lookahead so matches may overlap, exactly like separate searches.
+_BASE_DATE_RE = re.compile(
+    r"(?="
+    r"(?i:(?P<label>" + "|".join(_CLOSE_DATE_LABELS) + r")[:\s]+(?P<close>[A-Za-z]+\s+\d{1,2},?\s+\d{4}))"
+    r"|\b(?P<iso_year>\d{4})-(?P<iso_month>\d{2})-(?P<iso_day>\d{2})\b"
+    r"|\b(?P<month>[A-Za-z]+)\s+(?P<day>\d{1,2}),?\s+(?P<year>\d{4})\b"
+    r")"
+)
+
+
+def _parse_month_day_year(text: str) -> datetime:
+    """Parse "January 5, 2024" / "Jan 5 2024"; only unusual spellings reach dateutil."""
+    compact = " ".join(text.replace(",", " ").split())
+    for fmt in ("%B %d %Y", "%b %d %Y"):
+        try:
+            return datetime.strptime(compact, fmt)
+        except ValueError:
+            pass
+    return date_parser.parse(text, fuzzy=True)
+
+
 class DateInferencer:
     """Infers realistic dates from natural language and context."""
     
@@ -89,44 +238,27 @@ class DateInferencer:
         
         text = text.strip().lower()
         
-        # Try dateutil parser first
-        try:
-            parsed = date_parser.parse(text, default=self.base_date, fuzzy=True)
-            if parsed and parsed.year >= 2020:  # Ensure reasonable date
-                return parsed
-        except Exception:
-            pass
-        
+        # Stdlib fast path for ISO / US dates, then the fuzzy dateutil parser
+        parsed = self._parse_exact(text)
+        if parsed is None and (any(ch.isdigit() for ch in text) or _DATEUTIL_WORD_RE.search(text)):
+            try:
+                parsed = date_parser.parse(text, default=self.base_date, fuzzy=True)
+            except Exception:
+                parsed = None
+        if parsed and parsed.year >= 2020:  # Ensure reasonable date
+            return parsed
+
         # Handle relative expressions
-        relative_patterns = {
-            r"(\d+)\s+days?\s+later": lambda m: self.current_date + timedelta(days=int(m.group(1))),
-            r"(\d+)\s+weeks?\s+later": lambda m: self.current_date + timedelta(weeks=int(m.group(1))),
-            r"(\d+)\s+months?\s+later": lambda m: self.current_date + relativedelta(months=int(m.group(1))),
-            r"next\s+week": lambda m: self.current_date + timedelta(weeks=1),
-            r"next\s+month": lambda m: self.current_date + relativedelta(months=1),
-            r"two\s+days?\s+later": lambda m: self.current_date + timedelta(days=2),
-            r"three\s+days?\s+later": lambda m: self.current_date + timedelta(days=3),
-        }
-        
-        for pattern, func in relative_patterns.items():
-            match = re.search(pattern, text)
+        for pattern, offset in _RELATIVE_PATTERNS:
+            match = pattern.search(text)
             if match:
-                return func(match)
-        
-        # Handle month names
-        month_patterns = {
-            "january": 1, "jan": 1, "february": 2, "feb": 2,
-            "march": 3, "mar": 3, "april": 4, "apr": 4,
-            "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7,
-            "august": 8, "aug": 8, "september": 9, "sep": 9, "sept": 9,
-            "october": 10, "oct": 10, "november": 11, "nov": 11,
-            "december": 12, "dec": 12
-        }
+                return self.current_date + offset(match)
         
-        for month_name, month_num in month_patterns.items():
-            if month_name in text:
-                day_match = re.search(r"(\d{1,2})(?:st|nd|rd|th)?", text)
-                if day_match:
+        # Handle month names: the first name in _MONTH_NUMBERS order found anywhere in the text
+        day_match = _DAY_RE.search(text)
+        if day_match:
+            for month_name, month_num in _MONTH_NUMBERS.items():
+                if month_name in text:
                     day = int(day_match.group(1))
                     year = self.base_date.year
                     try:
@@ -135,7 +267,27 @@ class DateInferencer:
                         return datetime(year, month_num, 28)
         
         return None
-    
+
+    def _parse_exact(self, text: str) -> datetime | None:
+        """
+        Parse unambiguous date shapes without dateutil.
+
+        Fields the text doesn't carry come from base_date, as with
+        ``date_parser.parse(default=base_date)``.
+        """
+        try:
+            if _ISO_DATE_RE.match(text):
+                date = datetime.strptime(text, "%Y-%m-%d")
+            elif _US_DATE_RE.match(text):
+                date = datetime.strptime(text, "%m/%d/%Y")
+            elif _ISO_DATETIME_RE.match(text):
+                return datetime.fromisoformat(text)
+            else:
+                return None
+        except ValueError:
+            return None
+        return self.base_date.replace(year=date.year, month=date.month, day=date.day)
+
     def infer_realistic_date(self, phase: str, event_index: int, total_events: int, gap_days: int = 3) -> datetime:
         """
         Infer a realistic date based on phase and event position with configurable gap.
@@ -150,34 +302,22 @@ class DateInferencer:
             Realistic datetime (never epoch)
         """
         # Base timeline: assume deal started 3-6 months ago
-        months_ago = 4
-        start_date = self.base_date - relativedelta(months=months_ago)
+        start_date = self.base_date - _MONTHS_4
         
         # Phase-based date ranges
-        phase_days = {
-            "Discovery Phase": (0, 14),
-            "Pricing Negotiation Phase": (14, 35),
-            "Delivery Planning Phase": (35, 50),
-            "Issue/Escalation Phase": (50, 70),
-            "Final Decision Phase": (70, 90),
-        }
+        progress = event_index / max(total_events, 1)
+        day_min, day_max = _PHASE_DAY_RANGES.get(phase, (0, 90))
+        offset = timedelta(days=int(day_min + (day_max - day_min) * progress))
         
-        if phase in phase_days:
-            day_min, day_max = phase_days[phase]
-            phase_progress = event_index / max(total_events, 1)
-            day_offset = day_min + (day_max - day_min) * phase_progress
-        else:
-            day_offset = (event_index / max(total_events, 1)) * 90
-        
-        inferred_date = start_date + timedelta(days=int(day_offset))
+        inferred_date = start_date + offset
         
         # Ensure date is not in the future
         if inferred_date > self.base_date:
-            inferred_date = self.base_date - timedelta(days=1)
+            inferred_date = self.base_date - _ONE_DAY
         
         # Ensure date is not epoch (before 2000)
         if inferred_date.year < 2000:
-            inferred_date = datetime(2024, 1, 1) + timedelta(days=int(day_offset))
+            inferred_date = datetime(2024, 1, 1) + offset
         
         return inferred_date
     
@@ -195,10 +335,10 @@ class DateInferencer:
         if last_date:
             next_date = last_date + timedelta(days=gap_days)
         else:
-            next_date = self.base_date - relativedelta(months=4)
+            next_date = self.base_date - _MONTHS_4
         
         if next_date > self.base_date:
-            next_date = self.base_date - timedelta(days=1)
+            next_date = self.base_date - _ONE_DAY
         
         if next_date.year < 2000:
             next_date = datetime(2024, 1, 1)
@@ -264,6 +404,14 @@ Deal Context:
 Extract at least 10-15 events covering ALL phases. Focus on REAL events mentioned in the document.
 """.strip()
 
+# Characters of deal context sent to the model
+_MAX_CONTEXT_CHARS = 12000
+
+
+def _build_prompt(context: str) -> str:
+    """Timeline prompt for `context`. Not memoized: generate_json already caches responses by prompt digest."""
+    return PROMPT_TEMPLATE.format(context=context[:_MAX_CONTEXT_CHARS])
+
 
 @dataclass
 class TimelineAgent(BaseAgent):
@@ -295,47 +443,65 @@ class TimelineAgent(BaseAgent):
         # Extract base date from document first (for accurate date inference)
         base_date = self._extract_base_date_from_context(context)
         
-        prompt = PROMPT_TEMPLATE.format(context=context[:12000])
+        prompt = _build_prompt(context)
         
         try:
-            result = generate_json(prompt)
-            
-            if not isinstance(result, dict):
-                return self._default_timeline()
-            
-            events = result.get("events", [])
-            if not events or len(events) < 5:
-                events = self._enhance_events(events, context)
-                result["events"] = events
-            
-            # Process events: parse dates and ensure realistic timestamps (use extracted base_date)
-            processed_events = self._process_events(events, context, base_date)
-            result["events"] = processed_events
-            
-            # Ensure all phases covered with start + end timestamps
-            result["events"] = self._ensure_phase_coverage(result["events"], context, base_date)
-            
-            # Calculate timeline score
-            result["timeline_score"] = self._calculate_timeline_score(result["events"], context)
-            
-            # Ensure other fields
-            result.setdefault("phase_summary", self._generate_phase_summary(result["events"]))
-            result.setdefault("average_phase_score", 5.0)
-            result.setdefault("major_blockers", [])
-            result.setdefault("communication_events", [])
-            
-            return result
-            
+            return self._finalize(generate_json(prompt), context, base_date)
         except Exception as e:
             return self._extract_fallback_timeline(context, base_date)
     
-    def _calculate_timeline_score(self, events: list[dict[str, Any]], context: str) -> float:
+    async def analyze_async(self, context: str) -> dict[str, Any]:
+        """Async variant of `analyze`; awaits the LLM call so several deals can overlap."""
+        if not context or len(context.strip()) < 50:
+            return self._default_timeline()
+        
+        base_date = self._extract_base_date_from_context(context)
+        
+        prompt = _build_prompt(context)
+        
+        try:
+            return self._finalize(await generate_json_async(prompt), context, base_date)
+        except Exception:
+            return self._extract_fallback_timeline(context, base_date)
+    
+    def _finalize(self, result: Any, context: str, base_date: datetime) -> dict[str, Any]:
+        """Post-process a raw LLM timeline: enrich, date, cover phases and score events."""
+        if not isinstance(result, dict):
+            return self._default_timeline()
+        
+        context_lower = context.lower()
+        
+        events = result.get("events", [])
+        if not events or len(events) < 5:
+            events = self._enhance_events(events, context, context_lower)
+            result["events"] = events
+        
+        # Process events: parse dates and ensure realistic timestamps (use extracted base_date)
+        processed_events = self._process_events(events, context, base_date)
+        result["events"] = processed_events
+        
+        # Ensure all phases covered with start + end timestamps
+        result["events"] = self._ensure_phase_coverage(result["events"], context, base_date)
+        
+        # Calculate timeline score
+        result["timeline_score"] = self._calculate_timeline_score(result["events"], context, context_lower)
+        
+        # Ensure other fields
+        result.setdefault("phase_summary", self._generate_phase_summary(result["events"]))
+        result.setdefault("average_phase_score", 5.0)
+        result.setdefault("major_blockers", [])
+        result.setdefault("communication_events", [])
+        
+        return result
+    
+    def _calculate_timeline_score(self, events: list[dict[str, Any]], context: str, context_lower: str | None = None) -> float:
         """
         Calculate Timeline Score (1-10) based on clarity, ordering, missing events, ambiguity, delays.
         
         Args:
             events: List of timeline events
             context: Original context
+            context_lower: `context.lower()`, if the caller already has it
             
         Returns:
             Timeline score (1-10)
@@ -347,7 +513,7 @@ class TimelineAgent(BaseAgent):
         
         # Check for missing phases (penalty)
         existing_phases = {e.get("phase") for e in events if isinstance(e, dict)}
-        missing_phases = set(REQUIRED_PHASES) - existing_phases
+        missing_phases = _REQUIRED_PHASES_SET.difference(existing_phases)
         base_score -= len(missing_phases) * 1.5  # -1.5 per missing phase
         
         # Check for date clarity (penalty for vague dates)
@@ -355,29 +521,22 @@ class TimelineAgent(BaseAgent):
         for event in events:
             if isinstance(event, dict):
                 timestamp = str(event.get("timestamp", ""))
-                if any(vague in timestamp.lower() for vague in ["week", "month", "day", "unknown", "tbd"]):
+                timestamp = timestamp.lower()
+                if any(vague in timestamp for vague in _VAGUE_DATE_MARKERS):
                     vague_dates += 1
         base_score -= min(2.0, vague_dates * 0.3)  # Penalty for vague dates
         
-        # Check for ordering issues (penalty)
-        try:
-            dates = []
-            for event in events:
-                if isinstance(event, dict):
-                    timestamp = event.get("timestamp", "")
-                    try:
-                        date = datetime.strptime(timestamp, "%Y-%m-%d")
-                        dates.append(date)
-                    except Exception:
-                        pass
-            
-            if len(dates) > 1:
-                # Check if dates are in order
-                is_ordered = all(dates[i] <= dates[i+1] for i in range(len(dates)-1))
-                if not is_ordered:
-                    base_score -= 1.5  # Penalty for unordered dates
-        except Exception:
-            pass
+        # Check for ordering issues (penalty), comparing dates as proleptic ordinals
+        days = []
+        for event in events:
+            if isinstance(event, dict):
+                try:
+                    days.append(datetime.fromisoformat(event.get("timestamp", "")).toordinal())
+                except (TypeError, ValueError):
+                    pass
+        
+        if len(days) > 1 and not all(map(le, days, days[1:])):
+            base_score -= 1.5  # Penalty for unordered dates
         
         # Check for delays/escalations (penalty)
         escalation_count = sum(
@@ -388,8 +547,9 @@ class TimelineAgent(BaseAgent):
             base_score -= 2.0  # Penalty for many escalations
         
         # Check for ambiguity keywords
-        ambiguity_keywords = ["unclear", "tbd", "to be determined", "unknown", "maybe", "possibly"]
-        ambiguity_count = sum(1 for keyword in ambiguity_keywords if keyword in context.lower())
+        if context_lower is None:
+            context_lower = context.lower()
+        ambiguity_count = sum(1 for keyword in _AMBIGUITY_KEYWORDS if keyword in context_lower)
         base_score -= min(1.5, ambiguity_count * 0.2)
         
         # Reward for good structure
@@ -414,60 +574,48 @@ class TimelineAgent(BaseAgent):
         Returns:
             Base datetime for date inference
         """
-        import re
-        from dateutil import parser as date_parser
-        
         dates_found = []
-        
-        # Look for close date / decision date
-        close_patterns = [
-            r"close date[:\s]+([A-Za-z]+\s+\d{1,2},?\s+\d{4})",
-            r"closed[:\s]+([A-Za-z]+\s+\d{1,2},?\s+\d{4})",
-            r"decision date[:\s]+([A-Za-z]+\s+\d{1,2},?\s+\d{4})",
-            r"final date[:\s]+([A-Za-z]+\s+\d{1,2},?\s+\d{4})",
-        ]
-        
-        for pattern in close_patterns:
-            match = re.search(pattern, context, re.IGNORECASE)
-            if match:
-                try:
-                    date = date_parser.parse(match.group(1), fuzzy=True)
-                    if date.year >= 2020 and date.year <= datetime.now().year + 1:
-                        return date
-                except Exception:
-                    pass
-        
-        # Look for dates in YYYY-MM-DD format
-        iso_dates = re.findall(r'\b(\d{4})-(\d{2})-(\d{2})\b', context)
-        for year, month, day in iso_dates:
+        close_dates: dict[str, str] = {}
+        now = datetime.now()
+        max_year = now.year + 1
+        
+        for match in _BASE_DATE_RE.finditer(context):
+            if match.group("close"):
+                # Only the first date after each close-date label counts
+                close_dates.setdefault(match.group("label").lower(), match.group("close"))
+                continue
             try:
-                date = datetime(int(year), int(month), int(day))
-                if date.year >= 2020 and date.year <= datetime.now().year + 1:
+                if match.group("iso_year"):
+                    # Dates in YYYY-MM-DD format
+                    date = datetime(int(match.group("iso_year")), int(match.group("iso_month")), int(match.group("iso_day")))
+                else:
+                    # Dates in "Month Day, Year" format
+                    date = _parse_month_day_year(f"{match.group('month')} {match.group('day')}, {match.group('year')}")
+                if date.year >= 2020 and date.year <= max_year:
                     dates_found.append(date)
             except Exception:
                 pass
         
-        # Look for dates in "Month Day, Year" format
-        month_date_pattern = r'\b([A-Za-z]+)\s+(\d{1,2}),?\s+(\d{4})\b'
-        month_dates = re.findall(month_date_pattern, context)
-        for month_str, day, year in month_dates:
-            try:
-                date = date_parser.parse(f"{month_str} {day}, {year}", fuzzy=True)
-                if date.year >= 2020 and date.year <= datetime.now().year + 1:
-                    dates_found.append(date)
-            except Exception:
-                pass
+        # A close date / decision date takes priority over every other date
+        for label in _CLOSE_DATE_LABELS:
+            if label in close_dates:
+                try:
+                    date = _parse_month_day_year(close_dates[label])
+                    if date.year >= 2020 and date.year <= max_year:
+                        return date
+                except Exception:
+                    pass
         
         # Return latest date found, or default to 4 months ago
         if dates_found:
             latest_date = max(dates_found)
             # Use latest date as base, but ensure it's not in the future
-            if latest_date > datetime.now():
-                return datetime.now() - relativedelta(months=4)
+            if latest_date > now:
+                return now - _MONTHS_4
             return latest_date
         
         # Default: assume deal closed 1-3 months ago
-        return datetime.now() - relativedelta(months=2)
+        return now - _MONTHS_2
     
     def _process_events(self, events: list[dict[str, Any]], context: str, base_date: datetime | None = None) -> list[dict[str, Any]]:
         """
@@ -515,19 +663,14 @@ class TimelineAgent(BaseAgent):
             
             last_date = parsed_date
             
-            # Format as ISO date
-            iso_date = parsed_date.strftime("%Y-%m-%d")
-            
-            # Ensure sentiment
-            sentiment = event.get("sentiment", PHASE_SENTIMENT.get(phase, "neutral"))
-            
+            # Fallbacks are only computed for keys the event lacks
             processed.append({
-                "event_name": event.get("event_name", f"Event {i+1}"),
-                "description": event.get("description", event.get("summary", "")),
+                "event_name": event["event_name"] if "event_name" in event else f"Event {i+1}",
+                "description": event["description"] if "description" in event else event.get("summary", ""),
                 "phase": phase,
-                "timestamp": iso_date,
-                "confidence": max(0.0, min(1.0, float(event.get("confidence", 0.7)))),
-                "sentiment": sentiment
+                "timestamp": parsed_date.date().isoformat(),
+                "confidence": _clamp01(event.get("confidence", 0.7)),
+                "sentiment": event["sentiment"] if "sentiment" in event else PHASE_SENTIMENT.get(phase, "neutral")
             })
         
         return processed
@@ -544,33 +687,37 @@ class TimelineAgent(BaseAgent):
         Returns:
             Events with all phases covered, including start + end for each phase
         """
+        present_phases = {e.get("phase") for e in events if isinstance(e, dict)}
+        if present_phases >= _REQUIRED_PHASES_SET:
+            # Nothing to generate: keep required-phase events, ordered by date then phase as below
+            covered = [e for e in events if isinstance(e, dict) and e.get("phase") in _REQUIRED_PHASES_SET]
+            covered.sort(key=lambda e: (e["timestamp"], _PHASE_ORDER[e["phase"]]))
+            return covered
+        
         inferencer = DateInferencer(base_date=base_date)
         last_date = None
         
-        # Find last event date
+        # One pass: latest date overall and events grouped by phase
+        phase_events = {phase: [] for phase in REQUIRED_PHASES}
         for event in events:
-            if isinstance(event, dict):
-                try:
-                    event_date = datetime.strptime(event.get("timestamp", ""), "%Y-%m-%d")
-                    if not last_date or event_date > last_date:
-                        last_date = event_date
-                except Exception:
-                    pass
+            if not isinstance(event, dict):
+                continue
+            try:
+                event_date = datetime.fromisoformat(event.get("timestamp", ""))
+            except (TypeError, ValueError):
+                event_date = None
+            if event_date and (not last_date or event_date > last_date):
+                last_date = event_date
+            
+            phase = event.get("phase")
+            if phase in phase_events:
+                phase_events[phase].append(event)
         
         if not last_date:
-            last_date = datetime.now() - relativedelta(months=4)
-        
-        # Group events by phase
-        phase_events = {phase: [] for phase in REQUIRED_PHASES}
-        for event in events:
-            if isinstance(event, dict):
-                phase = event.get("phase")
-                if phase in phase_events:
-                    phase_events[phase].append(event)
+            last_date = datetime.now() - _MONTHS_4
         
         # Ensure each phase has start and end events
         result_events = []
-        phase_start_dates = {}
         
         for phase in REQUIRED_PHASES:
             phase_evts = phase_events[phase]
@@ -578,20 +725,12 @@ class TimelineAgent(BaseAgent):
             if phase_evts:
                 # Phase has events, use them
                 result_events.extend(phase_evts)
-                # Get earliest date in phase
-                try:
-                    phase_dates = [datetime.strptime(e.get("timestamp", ""), "%Y-%m-%d") for e in phase_evts if e.get("timestamp")]
-                    if phase_dates:
-                        phase_start_dates[phase] = min(phase_dates)
-                except Exception:
-                    pass
             else:
                 # Generate start event for missing phase
                 start_date = inferencer.get_next_date(last_date, gap_days=3)
                 start_event = self._generate_phase_event(phase, context, "start", start_date, inferencer)
                 if start_event:
                     result_events.append(start_event)
-                    phase_start_dates[phase] = start_date
                     last_date = start_date
                 
                 # Generate end event for phase
@@ -601,43 +740,21 @@ class TimelineAgent(BaseAgent):
                     result_events.append(end_event)
                     last_date = end_date
         
-        # Sort by date
-        result_events.sort(key=lambda e: e.get("timestamp", "2000-01-01"))
+        # Sort by date (ISO strings order chronologically; every event here carries a timestamp)
+        result_events.sort(key=itemgetter("timestamp"))
         
         return result_events
     
     def _generate_phase_event(self, phase: str, context: str, event_type: str, date: datetime, inferencer: DateInferencer) -> dict[str, Any] | None:
         """Generate event for phase (start or end)."""
-        phase_events = {
-            "Discovery Phase": {
-                "start": ("Initial Discovery", "Initial contact and requirements gathering started"),
-                "end": ("Discovery Complete", "Discovery phase completed, moving to pricing")
-            },
-            "Pricing Negotiation Phase": {
-                "start": ("Pricing Discussion Begins", "Pricing negotiation phase started"),
-                "end": ("Pricing Negotiation Complete", "Pricing discussions concluded")
-            },
-            "Delivery Planning Phase": {
-                "start": ("Delivery Planning Starts", "Implementation and delivery planning began"),
-                "end": ("Delivery Planning Complete", "Delivery planning phase completed")
-            },
-            "Issue/Escalation Phase": {
-                "start": ("Issues Identified", "Problems or concerns raised"),
-                "end": ("Escalation Resolved", "Issues addressed or escalated further")
-            },
-            "Final Decision Phase": {
-                "start": ("Final Decision Process", "Final decision phase initiated"),
-                "end": ("Final Outcome", "Deal closed - outcome determined")
-            },
-        }
-        
-        if phase in phase_events and event_type in phase_events[phase]:
-            event_name, description = phase_events[phase][event_type]
+        names = _PHASE_STUB_EVENTS.get((phase, event_type))
+        if names:
+            event_name, description = names
             return {
                 "event_name": event_name,
                 "description": description,
                 "phase": phase,
-                "timestamp": date.strftime("%Y-%m-%d"),
+                "timestamp": date.date().isoformat(),
                 "confidence": 0.5,
                 "sentiment": PHASE_SENTIMENT.get(phase, "neutral")
             }
@@ -646,32 +763,21 @@ class TimelineAgent(BaseAgent):
     def _normalize_events(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Ensure all events have required fields."""
         normalized = []
+        today = datetime.now().date().isoformat()
         for event in events:
             if not isinstance(event, dict):
                 continue
             
             phase = event.get("phase", "Discovery Phase")
-            if phase not in REQUIRED_PHASES:
-                phase_lower = phase.lower()
-                if "discovery" in phase_lower or "initial" in phase_lower:
-                    phase = "Discovery Phase"
-                elif "pricing" in phase_lower or "price" in phase_lower or "negotiation" in phase_lower:
-                    phase = "Pricing Negotiation Phase"
-                elif "delivery" in phase_lower or "planning" in phase_lower:
-                    phase = "Delivery Planning Phase"
-                elif "escalation" in phase_lower or "issue" in phase_lower or "problem" in phase_lower:
-                    phase = "Issue/Escalation Phase"
-                elif "final" in phase_lower or "outcome" in phase_lower or "decision" in phase_lower:
-                    phase = "Final Decision Phase"
-                else:
-                    phase = "Discovery Phase"
+            if phase not in _REQUIRED_PHASES_SET:
+                phase = _route_phase(phase)
             
             normalized.append({
                 "event_name": event.get("event_name", event.get("summary", "Event")),
                 "description": event.get("description", event.get("summary", "Event occurred")),
                 "phase": phase,
-                "timestamp": event.get("timestamp", datetime.now().strftime("%Y-%m-%d")),
-                "confidence": max(0.0, min(1.0, float(event.get("confidence", 0.7)))),
+                "timestamp": event.get("timestamp", today),
+                "confidence": _clamp01(event.get("confidence", 0.7)),
                 "sentiment": event.get("sentiment", PHASE_SENTIMENT.get(phase, "neutral"))
             })
         
@@ -689,67 +795,59 @@ class TimelineAgent(BaseAgent):
                 summaries[phase] = f"Events occurred in {phase}"
         return summaries
     
-    def _enhance_events(self, events: list, context: str) -> list[dict[str, Any]]:
+    def _enhance_events(self, events: list, context: str, context_lower: str | None = None) -> list[dict[str, Any]]:
         """Enhance events by extracting more from context."""
         enhanced = list(events) if events else []
         
         # Extract event types from context
-        context_lower = context.lower()
+        if context_lower is None:
+            context_lower = context.lower()
+        
+        # Enhanced events are spread over the Discovery Phase window (as infer_realistic_date
+        # would place them), counted from one deal-start date taken per call
+        discovery_start = DateInferencer().infer_realistic_date("Discovery Phase", 0, 15)
+        day_min, day_max = _PHASE_DAY_RANGES["Discovery Phase"]
         
         for event_type, patterns in EVENT_PATTERNS.items():
+            # First pattern of this event type present in the context (str.find is a C-level
+            # substring search, faster than any combined regex over all patterns)
             for pattern in patterns:
-                if pattern in context_lower:
-                    # Find context around pattern
-                    pattern_index = context_lower.find(pattern)
-                    if pattern_index >= 0:
-                        snippet = context[max(0, pattern_index-100):pattern_index+200]
-                        inferencer = DateInferencer()
-                        date = inferencer.infer_realistic_date("Discovery Phase", len(enhanced), 15)
-                        
-                        phase = "Discovery Phase"
-                        if "pricing" in pattern or "price" in pattern or "discount" in pattern:
-                            phase = "Pricing Negotiation Phase"
-                        elif "delivery" in pattern or "implementation" in pattern:
-                            phase = "Delivery Planning Phase"
-                        elif "escalation" in pattern or "issue" in pattern or "problem" in pattern:
-                            phase = "Issue/Escalation Phase"
-                        elif "final" in pattern or "decision" in pattern or "outcome" in pattern:
-                            phase = "Final Decision Phase"
-                        
-                        enhanced.append({
-                            "event_name": event_type.replace("_", " ").title(),
-                            "description": snippet.strip()[:150],
-                            "phase": phase,
-                            "timestamp": date.strftime("%Y-%m-%d"),
-                            "confidence": 0.6,
-                            "sentiment": PHASE_SENTIMENT.get(phase, "neutral")
-                        })
-                        break
+                pattern_index = context_lower.find(pattern)
+                if pattern_index >= 0:
+                    break
+            else:
+                continue
+            
+            # Find context around pattern
+            snippet = context[max(0, pattern_index-100):pattern_index+200]
+            date = discovery_start + timedelta(days=int(day_min + (day_max - day_min) * (len(enhanced) / 15)))
+            phase = _EVENT_PATTERN_PHASES[pattern]
+            
+            enhanced.append({
+                "event_name": _EVENT_NAMES[event_type],
+                "description": snippet.strip()[:150],
+                "phase": phase,
+                "timestamp": date.strftime("%Y-%m-%d"),
+                "confidence": 0.6,
+                "sentiment": PHASE_SENTIMENT.get(phase, "neutral")
+            })
         
         return enhanced[:15]
     
     def _extract_fallback_timeline(self, context: str, base_date: datetime | None = None) -> dict[str, Any]:
         """Generate timeline when all else fails."""
         if base_date is None:
-            base_date = datetime.now() - relativedelta(months=4)
-        inferencer = DateInferencer(base_date=base_date)
+            base_date = datetime.now() - _MONTHS_4
+        base_day = base_date.date()
         events = []
         
-        phase_dates = {
-            "Discovery Phase": (base_date, base_date + timedelta(days=14)),
-            "Pricing Negotiation Phase": (base_date + timedelta(days=14), base_date + timedelta(days=35)),
-            "Delivery Planning Phase": (base_date + timedelta(days=35), base_date + timedelta(days=50)),
-            "Issue/Escalation Phase": (base_date + timedelta(days=50), base_date + timedelta(days=70)),
-            "Final Decision Phase": (base_date + timedelta(days=70), base_date + timedelta(days=90)),
-        }
-        
-        for phase, (start_date, end_date) in phase_dates.items():
+        for phase, (start_offset, end_offset) in _PHASE_DAY_RANGES.items():
             # Start event
             events.append({
                 "event_name": f"{phase} Started",
                 "description": f"Initial activity in {phase}",
                 "phase": phase,
-                "timestamp": start_date.strftime("%Y-%m-%d"),
+                "timestamp": (base_day + timedelta(days=start_offset)).isoformat(),
                 "confidence": 0.4,
                 "sentiment": PHASE_SENTIMENT.get(phase, "neutral")
             })
@@ -758,7 +856,7 @@ class TimelineAgent(BaseAgent):
                 "event_name": f"{phase} Completed",
                 "description": f"Phase completed: {phase}",
                 "phase": phase,
-                "timestamp": end_date.strftime("%Y-%m-%d"),
+                "timestamp": (base_day + timedelta(days=end_offset)).isoformat(),
                 "confidence": 0.4,
                 "sentiment": PHASE_SENTIMENT.get(phase, "neutral")
             })
@@ -766,7 +864,7 @@ class TimelineAgent(BaseAgent):
         return {
             "events": events,
             "timeline_score": 4.0,
-            "phase_summary": {phase: f"Events in {phase}" for phase in REQUIRED_PHASES},
+            "phase_summary": dict(_FALLBACK_PHASE_SUMMARY),
             "average_phase_score": 5.0,
             "major_blockers": [],
             "communication_events": []
@@ -774,17 +872,15 @@ class TimelineAgent(BaseAgent):
     
     def _default_timeline(self) -> dict[str, Any]:
         """Return minimal default timeline."""
-        inferencer = DateInferencer()
         events = []
-        base_date = datetime.now() - relativedelta(months=4)
+        base_day = (datetime.now() - _MONTHS_4).date()
         
         for i, phase in enumerate(REQUIRED_PHASES):
-            date = base_date + timedelta(days=i*14)
             events.append({
                 "event_name": f"{phase} Started",
                 "description": f"Initial activity in {phase}",
                 "phase": phase,
-                "timestamp": date.strftime("%Y-%m-%d"),
+                "timestamp": (base_day + timedelta(days=i*14)).isoformat(),
                 "confidence": 0.3,
                 "sentiment": PHASE_SENTIMENT.get(phase, "neutral")
             })
@@ -792,7 +888,7 @@ class TimelineAgent(BaseAgent):
         return {
             "events": events,
             "timeline_score": 3.0,
-            "phase_summary": {phase: f"Activity in {phase}" for phase in REQUIRED_PHASES},
+            "phase_summary": dict(_DEFAULT_PHASE_SUMMARY),
             "average_phase_score": 5.0,
             "major_blockers": [],
             "communication_events": []
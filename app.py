@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
+import atexit
+import hashlib
+import os
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from operator import attrgetter
 from pathlib import Path
 from typing import Any, Dict
 
 from agents import ComparativeAgent, PlaybookAgent, TimelineAgent
 from agents.graph import DealForensicsGraph
-from core.config import ensure_directories
+from core.config import ensure_directories, get_settings
 from core.deal_parser import consolidate_documents, infer_metadata
 from core.document_validator import (
     validate_file_type,
@@ -16,6 +23,7 @@ from core.document_validator import (
     extract_text_from_document,
     validate_financial_document,
     sanitize_pdf_text,
+    scan_keywords,
     process_valid_document,
     validate_document_relevance,
     handle_invalid_document,
@@ -27,34 +35,83 @@ from rag.loader import DealDocumentLoader
 from rag.vectorstore import VectorStoreManager
 from utils.pdf_report import ReportBuilder
 
+_page_content = attrgetter("page_content")
+
 
 class DealForensicsOrchestrator:
     """Coordinates ingestion, retrieval, multi-agent reasoning, and persistence."""
 
     def __init__(self) -> None:
         ensure_directories()
-        self.loader = DealDocumentLoader()
-        self.embedding_service = EmbeddingService()
-        self.vector_store = VectorStoreManager(self.embedding_service)
-        self.timeline_agent = TimelineAgent()
-        self.comparative_agent = ComparativeAgent()
-        self.playbook_agent = PlaybookAgent()
-        self.scorer = DealScorer()
-        self.graph = DealForensicsGraph(
+
+    # Components are built on first use, so a rejected upload never loads the
+    # embedding model, the agents or the database connection
+
+    @cached_property
+    def loader(self) -> DealDocumentLoader:
+        return DealDocumentLoader()
+
+    @cached_property
+    def embedding_service(self) -> EmbeddingService:
+        return EmbeddingService()
+
+    @cached_property
+    def vector_store(self) -> VectorStoreManager:
+        return VectorStoreManager(self.embedding_service)
+
+    @cached_property
+    def timeline_agent(self) -> TimelineAgent:
+        return TimelineAgent()
+
+    @cached_property
+    def comparative_agent(self) -> ComparativeAgent:
+        return ComparativeAgent(embedding_service=self.embedding_service)
+
+    @cached_property
+    def playbook_agent(self) -> PlaybookAgent:
+        return PlaybookAgent()
+
+    @cached_property
+    def scorer(self) -> DealScorer:
+        return DealScorer()
+
+    @cached_property
+    def graph(self) -> DealForensicsGraph:
+        return DealForensicsGraph(
             timeline_agent=self.timeline_agent,
             comparative_agent=self.comparative_agent,
             playbook_agent=self.playbook_agent,
             scorer=self.scorer,
         )
-        self.repository = DealRepository()
-        self.report_builder = ReportBuilder()
+
+    @cached_property
+    def repository(self) -> DealRepository:
+        return DealRepository()
+
+    @cached_property
+    def report_builder(self) -> ReportBuilder:
+        return ReportBuilder()
+
+    @cached_property
+    def _upload_dir(self) -> Path:
+        upload_dir = Path(tempfile.mkdtemp(prefix="deal_forensics_"))
+        atexit.register(shutil.rmtree, upload_dir, ignore_errors=True)
+        return upload_dir
 
     def _save_temp_file(self, file_bytes: bytes, filename: str) -> Path:
-        """Save uploaded file to temporary location."""
+        """
+        Save uploaded file under a name derived from its content, so re-uploads of the
+        same file reuse the copy already on disk. The directory is removed at exit.
+        """
         suffix = Path(filename).suffix.lower()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as handle:
-            handle.write(file_bytes)
-            temp_path = Path(handle.name)
+        digest = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+        temp_path = self._upload_dir / f"{digest}{suffix}"
+        if not temp_path.exists():
+            # Stage and rename so a concurrent upload of the same file never reads a partial copy
+            fd, staging = tempfile.mkstemp(dir=self._upload_dir, suffix=suffix)
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(file_bytes)
+            os.replace(staging, temp_path)
         return temp_path
 
     def _build_deal_summary(self, metadata: Dict[str, Any], text: str) -> str:
@@ -95,65 +152,75 @@ class DealForensicsOrchestrator:
         
         # Step 4: Sanitize text
         extracted_text = sanitize_pdf_text(extracted_text)
+        keyword_hits = scan_keywords(extracted_text.lower())
         
         # Step 5: Validate financial/deal content (STRICT)
-        is_financial, financial_error = validate_financial_document(extracted_text, page_count)
+        is_financial, financial_error, financial_score = validate_financial_document(extracted_text, page_count, keyword_hits)
         if not is_financial:
             raise ValueError(financial_error)
-        
-        # Step 6: Final validation check (STRICT - prevents non-business content)
-        is_valid, validation_error = process_valid_document(extracted_text, page_count)
-        if not is_valid:
-            raise ValueError(validation_error)
-        
-        # Step 7: Additional LLM validation for edge cases (STRICT)
-        is_relevant, relevance_error = validate_document_relevance(extracted_text, filename)
-        if not is_relevant:
-            raise ValueError(f"❌ Document Validation Failed: {relevance_error}")
+
+        # Step 7 (LLM-bound) is only needed for documents step 5 wasn't confident about;
+        # it starts before step 6 so its round-trip overlaps the local check
+        relevance = None
+        executor = None
+        if financial_score <= get_settings().relevance_llm_threshold:
+            executor = ThreadPoolExecutor(max_workers=1)
+            relevance = executor.submit(validate_document_relevance, extracted_text, filename, keyword_hits)
+        try:
+            # Step 6: Final validation check (STRICT - prevents non-business content)
+            is_valid, validation_error = process_valid_document(extracted_text, page_count, keyword_hits)
+            if not is_valid:
+                raise ValueError(validation_error)
+
+            # Step 7: Additional LLM validation for edge cases (STRICT)
+            if relevance is not None:
+                is_relevant, relevance_error = relevance.result()
+                if not is_relevant:
+                    raise ValueError(f"❌ Document Validation Failed: {relevance_error}")
+        finally:
+            # Don't block a rejection on an LLM call whose answer is no longer needed
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
         
         # Step 8: Process document (all validations passed - NO OUTPUT if validation fails)
         temp_path = self._save_temp_file(file_bytes, filename)
-        try:
-            documents = self.loader.load(temp_path)
-            chunks = self.loader.chunk(documents)
-            
-            if not chunks:
-                raise ValueError("No readable content detected in the uploaded file after processing.")
-
-            self.vector_store.build_index(chunks)
-            combined_text = consolidate_documents(chunks)
-            metadata = infer_metadata(combined_text)
-            deal_summary = self._build_deal_summary(metadata.__dict__, combined_text)
-
-            retrieved_docs = self.vector_store.similarity_search(deal_summary, k=5)
-            retrieved_chunks = [doc.page_content for doc in retrieved_docs]
-
-            state = {
-                "raw_context": combined_text,
-                "deal_summary": deal_summary,
-                "retrieved_chunks": retrieved_chunks,
-            }
-
-            result = self.graph.run(state)
-
-            record = {
-                "deal_name": metadata.deal_name,
-                "owner": metadata.owner,
-                "industry": metadata.industry,
-                "value": metadata.value,
-                "stage": metadata.stage,
-                "scores": result.get("scorecard"),
-                "loss_summary": result.get("playbook", {}).get("what_went_wrong"),
-            }
-            self.repository.insert(record)
-
-            report_bytes = self.report_builder.build(result)
-            result["report"] = report_bytes
-            result["documents_ingested"] = len(chunks)
-            result["metadata"] = metadata.__dict__
-
-            return result
-        finally:
-            # Always clean up temp file
-            temp_path.unlink(missing_ok=True)
+        documents = self.loader.load(temp_path)
+        chunks = self.loader.chunk(documents)
+        
+        if not chunks:
+            raise ValueError("No readable content detected in the uploaded file after processing.")
+
+        self.vector_store.build_index(chunks)
+        combined_text = consolidate_documents(chunks)
+        metadata = infer_metadata(combined_text)
+        deal_summary = self._build_deal_summary(metadata.__dict__, combined_text)
+
+        retrieved_docs = self.vector_store.similarity_search(deal_summary, k=5)
+        retrieved_chunks = list(map(_page_content, retrieved_docs))
+
+        state = {
+            "raw_context": combined_text,
+            "deal_summary": deal_summary,
+            "retrieved_chunks": retrieved_chunks,
+        }
+
+        result = self.graph.run(state)
+
+        record = {
+            "deal_name": metadata.deal_name,
+            "owner": metadata.owner,
+            "industry": metadata.industry,
+            "value": metadata.value,
+            "stage": metadata.stage,
+            "scores": result.get("scorecard"),
+            "loss_summary": result.get("playbook", {}).get("what_went_wrong"),
+        }
+        self.repository.insert(record)
+
+        report_bytes = self.report_builder.build(result)
+        result["report"] = report_bytes
+        result["documents_ingested"] = len(chunks)
+        result["metadata"] = metadata.__dict__
+
+        return result
 
@@ -1,52 +1,231 @@
 """
-Disk-backed embedding cache to minimize repeated model calls.
+Caches that minimize repeated model calls: a SQLite-backed embedding cache, an
+in-memory LLM response cache and a similarity-based cache for near-duplicate prompts.
 """
 
 from __future__ import annotations
 
+import atexit
 import hashlib
-import pickle
-from dataclasses import dataclass
+import random
+import sqlite3
+import time
 from pathlib import Path
 from threading import Lock
-from typing import Any
+from typing import Any, Iterable
+
+import numpy as np
+import orjson
+from cachetools import LRUCache
 
 
-@dataclass
 class EmbeddingCache:
-    """Simple pickle-based cache keyed by hash of text or metadata."""
+    """
+    SQLite-backed embedding cache keyed by hash of text or metadata.
 
-    path: Path
-    _lock: Lock = Lock()
+    Each vector is a float32 blob in its own row, so `get` and `set` are point
+    lookups / upserts instead of rewriting the whole cache file. The most recently
+    used `memory_size` vectors are also kept in memory as float32 arrays, so
+    repeated texts within a run skip SQLite entirely.
 
-    def __post_init__(self) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self._write({})
+    Writes are buffered and committed together once `flush_every` are pending, on
+    `flush()`, or at interpreter exit.
+    """
 
-    def _read(self) -> dict[str, list[float]]:
-        with self._lock:
-            with self.path.open("rb") as handle:
-                return pickle.load(handle)
+    def __init__(self, path: Path, memory_size: int = 4096, flush_every: int = 256) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = max(1, flush_every)
+        self._lock = Lock()
+        self._memory: LRUCache = LRUCache(maxsize=max(1, memory_size))
+        self._pending: dict[str, bytes] = {}
+        try:
+            self._conn = self._connect()
+        except sqlite3.DatabaseError:
+            # Not a SQLite file, e.g. a legacy pickle cache still named by an old
+            # EMBEDDING_CACHE_PATH; keep it aside and start a fresh database
+            self.path.replace(self.path.with_name(f"{self.path.name}.legacy"))
+            self._conn = self._connect()
+        atexit.register(self.flush)
 
-    def _write(self, payload: dict[str, list[float]]) -> None:
-        with self._lock:
-            with self.path.open("wb") as handle:
-                pickle.dump(payload, handle)
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        try:
+            with self._lock, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+                )
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
 
     def _hash(self, text: str, **metadata: Any) -> str:
-        digest = hashlib.sha256()
-        digest.update(text.encode("utf-8"))
-        if metadata:
-            digest.update(repr(sorted(metadata.items())).encode("utf-8"))
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16)
+        for name, value in sorted(metadata.items()):
+            digest.update(f"\0{name}={value!r}".encode("utf-8"))
         return digest.hexdigest()
 
     def get(self, text: str, **metadata: Any) -> list[float] | None:
-        payload = self._read()
-        return payload.get(self._hash(text, **metadata))
+        key = self._hash(text, **metadata)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is None:
+                blob = self._pending.get(key)
+                if blob is None:
+                    row = self._conn.execute(
+                        "SELECT vector FROM embeddings WHERE hash = ?", (key,)
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    blob = row[0]
+                vector = np.frombuffer(blob, dtype=np.float32)
+                self._memory[key] = vector
+        return vector.tolist()
 
     def set(self, text: str, vector: list[float], **metadata: Any) -> None:
-        payload = self._read()
-        payload[self._hash(text, **metadata)] = vector
-        self._write(payload)
+        key = self._hash(text, **metadata)
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        with self._lock:
+            self._pending[key] = blob
+            self._memory[key] = np.frombuffer(blob, dtype=np.float32)
+            if len(self._pending) >= self.flush_every:
+                self._flush_locked()
+
+    def set_many(self, items: Iterable[tuple[str, list[float]]], **metadata: Any) -> None:
+        """Store several (text, vector) pairs and commit them in a single transaction."""
+        entries = [
+            (self._hash(text, **metadata), np.asarray(vector, dtype=np.float32).tobytes())
+            for text, vector in items
+        ]
+        if not entries:
+            return
+        with self._lock:
+            for key, blob in entries:
+                self._pending[key] = blob
+                self._memory[key] = np.frombuffer(blob, dtype=np.float32)
+            self._flush_locked()
+
+    def flush(self) -> None:
+        """Commit all buffered writes in one transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)",
+                self._pending.items(),
+            )
+        self._pending.clear()
+
+
+class LLMCache:
+    """
+    In-process LRU cache for LLM results with per-entry TTL.
+
+    Values are stored as JSON bytes, so every `get` returns a fresh object that the
+    caller may mutate without corrupting the cached copy.
+
+    Failed calls can be remembered briefly with `set_error` so that callers skip the
+    model while the provider is failing; the TTL is jittered so retries don't align.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 512,
+        default_ttl: float = 86400.0,
+        error_ttl: tuple[float, float] = (20.0, 40.0),
+    ) -> None:
+        self.default_ttl = default_ttl
+        self.error_ttl = error_ttl
+        self._entries: LRUCache = LRUCache(maxsize=max(1, maxsize))
+        self._lock = Lock()
 
+    @staticmethod
+    def cache_key(payload: Any) -> str:
+        """Stable SHA-256 key of a JSON-serializable payload (dict keys sorted)."""
+        encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, blob = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+        if blob is None:
+            return None  # Recorded failure, not a value
+        return orjson.loads(blob)
+
+    def failed(self, key: str) -> bool:
+        """True while a failure recorded with `set_error` for `key` is still live."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[1] is None and entry[0] > time.monotonic()
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        blob = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        with self._lock:
+            self._entries[key] = (expires_at, blob)
+
+    def set_error(self, key: str, ttl: float | None = None) -> None:
+        """Record that computing `key` just failed (TTL drawn from `error_ttl` unless given)."""
+        expires_at = time.monotonic() + (random.uniform(*self.error_ttl) if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, None)
+
+
+class SemanticCache:
+    """
+    Near-duplicate cache for prompts that share a fixed template ("skeleton").
+
+    Entries are grouped by skeleton hash; within a group a lookup returns the most
+    similar stored entry whose cosine similarity to the query vector reaches
+    `threshold`. Vectors are supplied by the caller, so any embedder can be used.
+    Each group keeps at most `maxsize` entries (oldest evicted first).
+    """
+
+    def __init__(self, threshold: float = 0.92, maxsize: int = 256) -> None:
+        self.threshold = threshold
+        self.maxsize = max(1, maxsize)
+        self._groups: dict[str, tuple[list[np.ndarray], list[tuple[bytes, dict[str, Any]]]]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _normalize(vector: Any) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm else array
+
+    def lookup(self, skeleton: str, vector: Any) -> tuple[Any, dict[str, Any]] | None:
+        """Return (value, metadata) of the closest entry at or above threshold, else None."""
+        query = self._normalize(vector)
+        with self._lock:
+            group = self._groups.get(skeleton)
+            if not group or not group[0]:
+                return None
+            vectors, payloads = group
+            sims = np.stack(vectors) @ query
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            blob, metadata = payloads[best]
+        return orjson.loads(blob), dict(metadata)
+
+    def add(self, skeleton: str, vector: Any, value: Any, metadata: dict[str, Any] | None = None) -> None:
+        blob = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        with self._lock:
+            vectors, payloads = self._groups.setdefault(skeleton, ([], []))
+            vectors.append(self._normalize(vector))
+            payloads.append((blob, dict(metadata or {})))
+            if len(vectors) > self.maxsize:
+                del vectors[0], payloads[0]
@@ -27,6 +27,10 @@ class Settings:
     mongo_collection: str
     report_output_dir: Path
     default_historical_data: Path
+    cache_dir: Path
+    llm_cache_enabled: bool
+    llm_cache_size: int
+    relevance_llm_threshold: float
 
 
 def _load_env() -> None:
@@ -55,8 +59,8 @@ def get_settings() -> Settings:
         ),
         vector_db_path=_path(os.getenv("VECTOR_DB_PATH", ".cache/vector_index"), ".cache/vector_index"),
         embedding_cache_path=_path(
-            os.getenv("EMBEDDING_CACHE_PATH", ".cache/embedding_cache.pkl"),
-            ".cache/embedding_cache.pkl",
+            os.getenv("EMBEDDING_CACHE_PATH", ".cache/embedding_cache.sqlite3"),
+            ".cache/embedding_cache.sqlite3",
         ),
         mongodb_uri=os.getenv("MONGODB_URI"),
         mongo_db=os.getenv("MONGODB_DB", "deal_forensics"),
@@ -66,6 +70,10 @@ def get_settings() -> Settings:
             os.getenv("DEFAULT_HISTORICAL_DATA", "data/historical_deals.json"),
             "data/historical_deals.json",
         ),
+        cache_dir=_path(os.getenv("CACHE_DIR", ".cache"), ".cache"),
+        llm_cache_enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        llm_cache_size=int(os.getenv("LLM_CACHE_SIZE", "512")),
+        relevance_llm_threshold=float(os.getenv("RELEVANCE_LLM_THRESHOLD", "0.9")),
     )
 
 
@@ -73,7 +81,16 @@ def ensure_directories() -> None:
     """Create filesystem locations that the app relies on."""
 
     settings = get_settings()
-    settings.vector_db_path.parent.mkdir(parents=True, exist_ok=True)
-    settings.embedding_cache_path.parent.mkdir(parents=True, exist_ok=True)
-    settings.report_output_dir.mkdir(parents=True, exist_ok=True)
+    # The defaults put several of these under the same .cache directory; visit each once
+    directories = dict.fromkeys(
+        (
+            settings.vector_db_path.parent,
+            settings.embedding_cache_path.parent,
+            settings.report_output_dir,
+            settings.cache_dir,
+        )
+    )
+    for directory in directories:
+        if not directory.is_dir():
+            directory.mkdir(parents=True, exist_ok=True)
 
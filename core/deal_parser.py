@@ -4,10 +4,17 @@ Helpers to normalize deal documents and metadata.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Any, Iterable
+from itertools import islice
+from operator import attrgetter
+from threading import Lock
+from typing import Any, Iterable, Iterator
+import hashlib
+import re
 
+from cachetools import LRUCache
+from dateutil import parser as date_parser
 from langchain_core.documents import Document
 
 
@@ -23,15 +30,124 @@ class DealMetadata:
     stage: str
 
 
+# "key: value" header names recognised for each metadata field
+_DEAL_NAME_KEYS = frozenset({"deal", "deal name", "opportunity", "customer", "buyer", "client"})
+_OWNER_KEYS = frozenset({"owner", "rep", "sales rep", "seller", "account manager"})
+_INDUSTRY_KEYS = frozenset({"industry", "vertical", "sector"})
+_VALUE_KEYS = frozenset({"value", "amount", "arr", "acv", "deal value", "deal size", "revenue"})
+_CLOSE_DATE_KEYS = frozenset({"close date", "closed", "decision date", "closed date", "final date"})
+_STAGE_KEYS = frozenset({"stage", "sales stage", "status", "outcome"})
+
+_CLOSE_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%b %d, %Y", "%B %d, %Y", "%d %B %Y", "%d %b %Y")
+
+_LINE_BREAK = re.compile(r'\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]')
+_ISO_DATE_PREFIX = re.compile(r'\d{4}-\d{2}-\d{2}')
+_MONEY_CLEAN = re.compile(r'[^\d.]')
+
+# Unstructured-text fallbacks in priority order: the first pattern matching anywhere
+# wins, at its leftmost match
+_VALUE_PATTERN_SOURCES = (
+    r'\$[\d,]+\.?\d*\s*(?:million|M|m)',
+    r'\$[\d,]+',
+    r'deal value[:\s]+\$?[\d,]+',
+    r'value[:\s]+\$?[\d,]+',
+    r'\$?[\d,]+\.?\d*\s*(?:million|M)',
+)
+_VALUE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in _VALUE_PATTERN_SOURCES)
+_OWNER_LABELS = ("owner", "sales rep", "rep", "account manager")
+_OWNER_NAME = r'[A-Z][a-zA-Z\s]+'
+
+
+def _priority_scanner(alternatives: Iterable[str]) -> re.Pattern[str]:
+    """
+    Combine prioritized patterns into one zero-width scan. Alternative `i` is captured
+    as group `p{i}`; at each position the highest-priority alternative that matches
+    there is reported.
+    """
+    return re.compile(
+        "(?=" + "|".join(f"(?P<p{i}>{alt})" for i, alt in enumerate(alternatives)) + ")",
+        re.IGNORECASE,
+    )
+
+
+_VALUE_SCANNER = _priority_scanner(_VALUE_PATTERN_SOURCES)
+_OWNER_SCANNER = _priority_scanner(
+    f"{re.escape(label)}[:\\s]+(?P<n{i}>{_OWNER_NAME})" for i, label in enumerate(_OWNER_LABELS)
+)
+
+
+def _first_by_priority(scanner: re.Pattern[str], text: str) -> tuple[int, re.Match[str]] | None:
+    """
+    Return ``(i, match)`` for the highest-priority alternative of `scanner` occurring
+    anywhere in `text`, at its leftmost position; the same result as calling
+    ``search`` with each pattern in turn and stopping at the first hit, in one pass.
+    """
+    best: tuple[int, re.Match[str]] | None = None
+    for match in scanner.finditer(text):
+        index = int(match.lastgroup[1:])
+        if best is None or index < best[0]:
+            best = (index, match)
+            if index == 0:
+                break
+    return best
+
+
+def _money_value(val_str: str) -> float | None:
+    cleaned = _MONEY_CLEAN.sub('', val_str.replace(",", ""))
+    try:
+        number = float(cleaned)
+    except ValueError:
+        return None
+    if "m" in val_str.lower() or "million" in val_str.lower():
+        return number * 1000000
+    return number
+
+
+_page_content = attrgetter("page_content")
+
+_TITLE_WORDS = ("deal", "opportunity", "platform", "system", "solution")
+
+INDUSTRY_KEYWORDS = {
+    "technology": ("tech", "saas", "software", "platform", "cloud", "digital"),
+    "healthcare": ("health", "medical", "hospital", "clinic", "patient"),
+    "financial": ("finance", "banking", "financial", "investment", "capital"),
+    "retail": ("retail", "e-commerce", "commerce", "store", "merchant"),
+    "manufacturing": ("manufacturing", "production", "factory", "industrial"),
+    "education": ("education", "school", "university", "learning", "student"),
+}
+
+# Inferred metadata keyed by a digest of the source text, so re-analysing the same
+# document skips the parse. Hits are copied because callers may mutate the result.
+_metadata_cache: LRUCache = LRUCache(maxsize=128)
+_metadata_cache_lock = Lock()
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Lazily yield the lines of `text`, split exactly as `str.splitlines()` would."""
+    start = 0
+    for match in _LINE_BREAK.finditer(text):
+        yield text[start:match.start()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
+
+
 def infer_metadata(text: str) -> DealMetadata:
     """
     Enhanced heuristic parser with improved extraction patterns.
     """
 
-    import re
-    from dateutil import parser as date_parser
-    
-    lower = text.lower()
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _metadata_cache_lock:
+        cached = _metadata_cache.get(key)
+    if cached is None:
+        cached = _infer_metadata(text)
+        with _metadata_cache_lock:
+            _metadata_cache[key] = cached
+    return replace(cached)
+
+
+def _infer_metadata(text: str) -> DealMetadata:
     deal_name = "Untitled Deal"
     owner = "Unknown"
     industry = "General"
@@ -39,23 +155,33 @@ def infer_metadata(text: str) -> DealMetadata:
     value = None
     close_date = None
 
-    # Extract from structured format (key: value)
-    for line in text.splitlines()[:50]:  # Check first 50 lines
+    # One pass over the first 50 lines: structured "key: value" fields, plus the first
+    # title-like line among the first 5 as a deal name fallback
+    title = None
+    for index, line in enumerate(islice(_iter_lines(text), 50)):
         normalized = line.strip()
+        if (
+            index < 5
+            and title is None
+            and 10 < len(normalized) < 100
+            and not normalized.startswith("#")
+            and any(word in normalized.lower() for word in _TITLE_WORDS)
+        ):
+            title = normalized[:80]  # Limit length
         if ":" not in normalized:
             continue
         key, val = normalized.split(":", 1)
         key = key.lower().strip()
         val = val.strip()
-        if key in {"deal", "deal name", "opportunity", "customer", "buyer", "client"}:
+        if key in _DEAL_NAME_KEYS:
             deal_name = val or deal_name
-        elif key in {"owner", "rep", "sales rep", "seller", "account manager"}:
+        elif key in _OWNER_KEYS:
             owner = val or owner
-        elif key in {"industry", "vertical", "sector"}:
+        elif key in _INDUSTRY_KEYS:
             industry = val or industry
-        elif key in {"value", "amount", "arr", "acv", "deal value", "deal size", "revenue"}:
+        elif key in _VALUE_KEYS:
             # Extract number from value (handles $2,500,000 or 2.5M)
-            cleaned = re.sub(r'[^\d.]', '', val.replace(",", ""))
+            cleaned = _MONEY_CLEAN.sub('', val.replace(",", ""))
             if "m" in val.lower() or "million" in val.lower():
                 try:
                     value = float(cleaned) * 1000000
@@ -71,87 +197,63 @@ def infer_metadata(text: str) -> DealMetadata:
                     value = float(cleaned)
                 except ValueError:
                     pass
-        elif key in {"close date", "closed", "decision date", "closed date", "final date"}:
-            for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%b %d, %Y", "%B %d, %Y", "%d %B %Y", "%d %b %Y"):
+        elif key in _CLOSE_DATE_KEYS:
+            iso_date = None
+            if _ISO_DATE_PREFIX.match(val):
                 try:
-                    close_date = datetime.strptime(val, fmt)
-                    break
+                    iso_date = datetime.fromisoformat(val[:10])
                 except ValueError:
-                    continue
-            # Try dateutil parser as fallback
+                    pass
+            if iso_date:
+                close_date = iso_date
+            else:
+                for fmt in _CLOSE_DATE_FORMATS:
+                    try:
+                        close_date = datetime.strptime(val, fmt)
+                        break
+                    except ValueError:
+                        continue
+            # Try dateutil parser as fallback for anything the stdlib formats miss
             if not close_date:
                 try:
                     close_date = date_parser.parse(val, fuzzy=True)
                 except Exception:
                     pass
-        elif key in {"stage", "sales stage", "status", "outcome"}:
+        elif key in _STAGE_KEYS:
             stage = val or stage
 
     # Enhanced extraction from unstructured text
     # Extract deal value from various patterns
     if value is None:
-        value_patterns = [
-            r'\$[\d,]+\.?\d*\s*(?:million|M|m)',
-            r'\$[\d,]+',
-            r'deal value[:\s]+\$?[\d,]+',
-            r'value[:\s]+\$?[\d,]+',
-            r'\$?[\d,]+\.?\d*\s*(?:million|M)',
-        ]
-        for pattern in value_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                val_str = match.group(0)
-                cleaned = re.sub(r'[^\d.]', '', val_str.replace(",", ""))
-                if "m" in val_str.lower() or "million" in val_str.lower():
-                    try:
-                        value = float(cleaned) * 1000000
-                        break
-                    except ValueError:
-                        pass
-                else:
-                    try:
-                        value = float(cleaned)
-                        break
-                    except ValueError:
-                        pass
-
-    # Extract deal name from title or first line
-    if deal_name == "Untitled Deal":
-        first_lines = text.splitlines()[:5]
-        for line in first_lines:
-            line = line.strip()
-            if len(line) > 10 and len(line) < 100 and not line.startswith("#"):
-                # Check if it looks like a title
-                if any(word in line.lower() for word in ["deal", "opportunity", "platform", "system", "solution"]):
-                    deal_name = line[:80]  # Limit length
+        first = _first_by_priority(_VALUE_SCANNER, text)
+        if first is not None:
+            index, match = first
+            value = _money_value(match.group(f"p{index}"))
+            # A match with no usable number (e.g. "$,") defers to the next patterns in order
+            for pattern in _VALUE_PATTERNS[index + 1:]:
+                if value is not None:
                     break
+                match = pattern.search(text)
+                if match:
+                    value = _money_value(match.group(0))
+
+    # Fall back to a title-like first line for the deal name
+    if deal_name == "Untitled Deal" and title:
+        deal_name = title
 
     # Extract owner/seller from patterns
     if owner == "Unknown":
-        owner_patterns = [
-            r'owner[:\s]+([A-Z][a-zA-Z\s]+)',
-            r'sales rep[:\s]+([A-Z][a-zA-Z\s]+)',
-            r'rep[:\s]+([A-Z][a-zA-Z\s]+)',
-            r'account manager[:\s]+([A-Z][a-zA-Z\s]+)',
-        ]
-        for pattern in owner_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                owner = match.group(1).strip()[:50]
-                break
+        first = _first_by_priority(_OWNER_SCANNER, text)
+        if first is not None:
+            index, match = first
+            owner = match.group(f"n{index}").strip()[:50]
 
     # Extract industry from context
     if industry == "General":
-        industry_keywords = {
-            "technology": ["tech", "saas", "software", "platform", "cloud", "digital"],
-            "healthcare": ["health", "medical", "hospital", "clinic", "patient"],
-            "financial": ["finance", "banking", "financial", "investment", "capital"],
-            "retail": ["retail", "e-commerce", "commerce", "store", "merchant"],
-            "manufacturing": ["manufacturing", "production", "factory", "industrial"],
-            "education": ["education", "school", "university", "learning", "student"],
-        }
-        for ind, keywords in industry_keywords.items():
-            if any(kw in lower for kw in keywords):
+        # Industries are checked in priority order, so the scan stops at the first hit
+        lowered = text.lower()
+        for ind, keywords in INDUSTRY_KEYWORDS.items():
+            if any(kw in lowered for kw in keywords):
                 industry = ind.title()
                 break
 
@@ -168,5 +270,5 @@ def infer_metadata(text: str) -> DealMetadata:
 def consolidate_documents(documents: Iterable[Document]) -> str:
     """Return a single normalized text blob for downstream processing."""
 
-    return "\n\n".join(doc.page_content for doc in documents)
+    return "\n\n".join(map(_page_content, documents))
 
@@ -7,7 +7,10 @@ rejecting irrelevant files like blank documents, images, or unrelated content.
 
 from __future__ import annotations
 
+import io
+import os
 import re
+import tempfile
 from pathlib import Path
 from typing import Any, Tuple
 
@@ -44,6 +47,9 @@ FINANCIAL_KEYWORDS = [
 # Minimum required financial keywords for validation
 MIN_FINANCIAL_KEYWORDS = 3
 
+# Financial keyword count at which a clean document scores full confidence
+CONFIDENT_FINANCIAL_KEYWORDS = 15
+
 # Keywords that indicate NON-business/illegal content (should be minimal or absent)
 NON_BUSINESS_KEYWORDS = [
     # Food & Cooking
@@ -103,6 +109,36 @@ NON_BUSINESS_KEYWORDS = [
 # Maximum allowed non-business keywords (if exceeded, likely not a business doc)
 MAX_NON_BUSINESS_KEYWORDS = 5  # More lenient - allow up to 5 non-business keywords
 
+# Terms that establish a business context (at least 2 required)
+BUSINESS_CONTEXT_KEYWORDS = [
+    "business", "company", "corporation", "enterprise", "organization",
+    "deal", "transaction", "agreement", "contract", "financial",
+    "investment", "acquisition", "merger", "valuation", "revenue"
+]
+
+# Financial indicators used by the document quality check (at least 1 required)
+FINANCIAL_INDICATORS = [
+    "pricing", "valuation", "deal", "contract", "agreement", "financial",
+    "investment", "acquisition", "merger", "equity", "revenue", "transaction",
+    "business", "company", "corporation", "enterprise"
+]
+
+# Every distinct keyword across the groups above, looked up once per document. Counts
+# are still taken over the lists, so a keyword listed twice counts twice as before.
+# Plain `in` checks: CPython's substring search is fast enough that a regex alternation
+# over these keywords is measurably slower.
+_ALL_KEYWORDS = frozenset(
+    FINANCIAL_KEYWORDS + NON_BUSINESS_KEYWORDS + BUSINESS_CONTEXT_KEYWORDS + FINANCIAL_INDICATORS
+)
+
+# Currency symbols, percentages or any number count as financial indicators. A digit
+# alone is enough, which also covers amounts like "2.5 million".
+_CURRENCY_RE = re.compile(r'[$₹€£¥%\d]')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B-\x0C\x0E-\x1F]')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
 # Minimum text length
 MIN_TEXT_LENGTH = 200
 
@@ -113,6 +149,29 @@ MAX_FILE_SIZE = 100 * 1024 * 1024
 MIN_FILE_SIZE = 100
 
 
+def scan_keywords(text_lower: str) -> dict[str, Any]:
+    """
+    Scan lowercased document text once for every validator keyword group.
+    
+    The result can be passed as `keyword_hits` to each validation step so the
+    document is only scanned once per request.
+    
+    Args:
+        text_lower: Lowercased document text
+        
+    Returns:
+        Dictionary of per-group hit counts and the non-business keywords found
+    """
+    found = {keyword for keyword in _ALL_KEYWORDS if keyword in text_lower}
+    return {
+        "financial": sum(1 for kw in FINANCIAL_KEYWORDS if kw in found),
+        "non_business": sum(1 for kw in NON_BUSINESS_KEYWORDS if kw in found),
+        "business_context": sum(1 for kw in BUSINESS_CONTEXT_KEYWORDS if kw in found),
+        "financial_indicators": sum(1 for kw in FINANCIAL_INDICATORS if kw in found),
+        "found_non_business": [kw for kw in NON_BUSINESS_KEYWORDS if kw in found],
+    }
+
+
 def validate_file_type(filename: str) -> Tuple[bool, str]:
     """
     Validate that the file is a PDF or DOCX.
@@ -166,6 +225,9 @@ def _extract_text_from_pdf(file_bytes: bytes) -> Tuple[str, int]:
     """
     Extract text from PDF and count pages.
     
+    Uses PDFium (pypdfium2) when installed, which is several times faster than
+    pypdf on long decks, and pypdf otherwise.
+    
     Args:
         file_bytes: PDF file content as bytes
         
@@ -173,23 +235,27 @@ def _extract_text_from_pdf(file_bytes: bytes) -> Tuple[str, int]:
         Tuple of (extracted_text: str, page_count: int)
     """
     try:
-        from pypdf import PdfReader
-        import io
-        
-        pdf_file = io.BytesIO(file_bytes)
-        reader = PdfReader(pdf_file)
-        
-        page_count = len(reader.pages)
-        text_parts = []
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            return _extract_text_with_pypdf(file_bytes)
         
-        for page_num, page in enumerate(reader.pages, 1):
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-            except Exception:
-                # Skip pages that can't be extracted
-                continue
+        # PDFium is not thread-safe, so pages are read sequentially
+        pdf = pdfium.PdfDocument(file_bytes)
+        try:
+            page_count = len(pdf)
+            text_parts = []
+            
+            for page_index in range(page_count):
+                try:
+                    page_text = pdf[page_index].get_textpage().get_text_range()
+                    if page_text:
+                        text_parts.append(page_text)
+                except Exception:
+                    # Skip pages that can't be extracted
+                    continue
+        finally:
+            pdf.close()
         
         extracted_text = "\n\n".join(text_parts)
         return extracted_text, page_count
@@ -198,6 +264,27 @@ def _extract_text_from_pdf(file_bytes: bytes) -> Tuple[str, int]:
         raise ValueError(f"Failed to extract text from PDF: {str(e)}")
 
 
+def _extract_text_with_pypdf(file_bytes: bytes) -> Tuple[str, int]:
+    """Extract text and page count from PDF with pure-Python pypdf."""
+    from pypdf import PdfReader
+    
+    reader = PdfReader(io.BytesIO(file_bytes))
+    
+    page_count = len(reader.pages)
+    text_parts = []
+    
+    for page in reader.pages:
+        try:
+            page_text = page.extract_text()
+            if page_text:
+                text_parts.append(page_text)
+        except Exception:
+            # Skip pages that can't be extracted
+            continue
+    
+    return "\n\n".join(text_parts), page_count
+
+
 def _extract_text_from_docx(file_bytes: bytes) -> Tuple[str, int]:
     """
     Extract text from DOCX and estimate page count.
@@ -211,8 +298,6 @@ def _extract_text_from_docx(file_bytes: bytes) -> Tuple[str, int]:
     try:
         # Use the same loader as the main system for consistency
         from langchain_community.document_loaders import Docx2txtLoader
-        import tempfile
-        import os
         
         # Save to temp file for Docx2txtLoader
         with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as temp_file:
@@ -241,7 +326,6 @@ def _extract_text_from_docx(file_bytes: bytes) -> Tuple[str, int]:
         # Fallback: try python-docx if available
         try:
             from docx import Document
-            import io
             
             docx_file = io.BytesIO(file_bytes)
             doc = Document(docx_file)
@@ -294,16 +378,21 @@ def _extract_text_from_txt(file_bytes: bytes) -> Tuple[str, int]:
         raise ValueError(f"Failed to extract text from TXT: {str(e)}")
 
 
-def validate_financial_document(text: str, page_count: int = 1) -> Tuple[bool, str]:
+def validate_financial_document(
+    text: str, page_count: int = 1, keyword_hits: dict[str, Any] | None = None
+) -> Tuple[bool, str, float]:
     """
     Validate that the document contains financial/deal content.
     
     Args:
         text: Extracted text from document
         page_count: Number of pages/sections in document
+        keyword_hits: Result of `scan_keywords`, if the caller already has it
         
     Returns:
-        Tuple of (is_valid: bool, error_message: str)
+        Tuple of (is_valid: bool, error_message: str, score: float). The score, in
+        [0, 1], rises with the number of financial keywords and falls with the share
+        of non-business keywords; it is 0.0 for rejected documents.
     """
     if not text or len(text.strip()) < MIN_TEXT_LENGTH:
         return False, (
@@ -311,13 +400,13 @@ def validate_financial_document(text: str, page_count: int = 1) -> Tuple[bool, s
             f"Found: {len(text.strip())} characters (minimum {MIN_TEXT_LENGTH} required).\n"
             f"This document may be blank, image-based, or corrupted.\n"
             f"Please upload a document with extractable text content."
-        )
+        ), 0.0
     
-    text_lower = text.lower()
+    if keyword_hits is None:
+        keyword_hits = scan_keywords(text.lower())
     
     # Check for financial keywords
-    found_keywords = [kw for kw in FINANCIAL_KEYWORDS if kw in text_lower]
-    keyword_count = len(found_keywords)
+    keyword_count = keyword_hits["financial"]
     
     if keyword_count < MIN_FINANCIAL_KEYWORDS:
         return False, (
@@ -325,18 +414,17 @@ def validate_financial_document(text: str, page_count: int = 1) -> Tuple[bool, s
             f"Found only {keyword_count} financial/deal-related terms (minimum {MIN_FINANCIAL_KEYWORDS} required).\n"
             f"Please upload a contract, valuation report, term sheet, or M&A document.\n\n"
             f"Expected keywords include: agreement, valuation, deal, contract, financials, investment, etc."
-        )
+        ), 0.0
     
     # Check for currency symbols or numbers (financial indicators)
-    currency_patterns = [r'\$', r'₹', r'€', r'£', r'¥', r'%', r'\d+[,\d]*\.?\d*\s*(?:million|billion|thousand|k|m|b)', r'\d+[,\d]*\.?\d*']
-    has_currency = any(re.search(pattern, text, re.IGNORECASE) for pattern in currency_patterns)
+    has_currency = _CURRENCY_RE.search(text) is not None
     
     if not has_currency:
         return False, (
             f"❌ Invalid Document – Document does not contain financial indicators.\n\n"
             f"No currency symbols ($, ₹, €, £) or financial numbers found.\n"
             f"Please upload a financial document with monetary values or percentages."
-        )
+        ), 0.0
     
     # Check for structured text (at least 1-2 lines with substantial content)
     lines = [line.strip() for line in text.split('\n') if line.strip()]
@@ -348,26 +436,26 @@ def validate_financial_document(text: str, page_count: int = 1) -> Tuple[bool, s
             f"Found only {len(substantial_lines)} substantial lines (minimum 1 required).\n"
             f"This document may be mostly blank or contain only images.\n"
             f"Please upload a document with readable, structured text content."
-        )
+        ), 0.0
     
     # Check page count (should have at least 1 page/section)
     if page_count < 1:
         return False, (
             f"❌ Invalid Document – Document has no readable content.\n\n"
             f"Please upload a valid document file with extractable content."
-        )
+        ), 0.0
     
     # Lenient validation: Check for non-business/illegal content indicators
     # Only flag if there are MANY non-business keywords (likely not a business doc)
-    non_business_count = sum(1 for keyword in NON_BUSINESS_KEYWORDS if keyword in text_lower)
+    non_business_count = keyword_hits["non_business"]
     
     # Only reject if there are significantly more non-business keywords than business keywords
-    financial_keyword_count = sum(1 for keyword in FINANCIAL_KEYWORDS if keyword in text_lower)
+    financial_keyword_count = keyword_hits["financial"]
     
     # Reject only if non-business keywords significantly outweigh business keywords
     if non_business_count > MAX_NON_BUSINESS_KEYWORDS and non_business_count > financial_keyword_count * 2:
         # Identify which non-business keywords were found
-        found_keywords = [kw for kw in NON_BUSINESS_KEYWORDS if kw in text_lower]
+        found_keywords = keyword_hits["found_non_business"]
         keyword_examples = ", ".join(found_keywords[:5])  # Show first 5
         
         return False, (
@@ -376,15 +464,10 @@ def validate_financial_document(text: str, page_count: int = 1) -> Tuple[bool, s
             f"Detected keywords: {keyword_examples}{'...' if len(found_keywords) > 5 else ''}\n\n"
             f"This system ONLY processes financial/deal documents.\n"
             f"Please upload a contract, valuation report, term sheet, or M&A document."
-        )
+        ), 0.0
     
     # Additional check: Ensure business context is present
-    business_context_keywords = [
-        "business", "company", "corporation", "enterprise", "organization",
-        "deal", "transaction", "agreement", "contract", "financial",
-        "investment", "acquisition", "merger", "valuation", "revenue"
-    ]
-    business_context_count = sum(1 for kw in business_context_keywords if kw in text_lower)
+    business_context_count = keyword_hits["business_context"]
     
     if business_context_count < 2:
         return False, (
@@ -392,9 +475,11 @@ def validate_financial_document(text: str, page_count: int = 1) -> Tuple[bool, s
             f"Found only {business_context_count} business-related terms (minimum 2 required).\n"
             f"This document does not appear to be a business/financial document.\n"
             f"Please upload a contract, valuation report, term sheet, or M&A document."
-        )
+        ), 0.0
     
-    return True, ""
+    score = min(1.0, financial_keyword_count / CONFIDENT_FINANCIAL_KEYWORDS)
+    score *= financial_keyword_count / (financial_keyword_count + non_business_count)
+    return True, "", score
 
 
 def validate_file_size(file_bytes: bytes) -> Tuple[bool, str]:
@@ -438,21 +523,24 @@ def sanitize_pdf_text(text: str) -> str:
         Sanitized text
     """
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
     # Remove control characters except newlines
-    text = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F]', '', text)
+    text = _CONTROL_CHARS_RE.sub('', text)
     # Normalize line breaks
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _BLANK_LINES_RE.sub('\n\n', text)
     return text.strip()
 
 
-def validate_document_relevance(text: str, filename: str = "") -> Tuple[bool, str]:
+def validate_document_relevance(
+    text: str, filename: str = "", keyword_hits: dict[str, Any] | None = None
+) -> Tuple[bool, str]:
     """
     Final LLM-based validation for edge cases with strict business content checking.
     
     Args:
         text: Extracted text from document
         filename: Optional filename
+        keyword_hits: Result of `scan_keywords`, if the caller already has it
         
     Returns:
         Tuple of (is_valid: bool, error_message: str)
@@ -460,10 +548,11 @@ def validate_document_relevance(text: str, filename: str = "") -> Tuple[bool, st
     if not text or len(text.strip()) < MIN_TEXT_LENGTH:
         return False, "Document is too short or empty."
     
-    text_lower = text.lower()
+    if keyword_hits is None:
+        keyword_hits = scan_keywords(text.lower())
     
     # STRICT keyword check first
-    keyword_count = sum(1 for keyword in FINANCIAL_KEYWORDS if keyword in text_lower)
+    keyword_count = keyword_hits["financial"]
     if keyword_count < MIN_FINANCIAL_KEYWORDS:
         return False, (
             f"Document does not contain sufficient financial/deal-related content. "
@@ -471,12 +560,12 @@ def validate_document_relevance(text: str, filename: str = "") -> Tuple[bool, st
         )
     
     # Check for non-business content (lenient - only reject if significantly more non-business than business)
-    non_business_count = sum(1 for keyword in NON_BUSINESS_KEYWORDS if keyword in text_lower)
-    financial_keyword_count = sum(1 for keyword in FINANCIAL_KEYWORDS if keyword in text_lower)
+    non_business_count = keyword_hits["non_business"]
+    financial_keyword_count = keyword_hits["financial"]
     
     # Only reject if non-business keywords significantly outweigh business keywords
     if non_business_count > MAX_NON_BUSINESS_KEYWORDS and non_business_count > financial_keyword_count * 2:
-        found_keywords = [kw for kw in NON_BUSINESS_KEYWORDS if kw in text_lower]
+        found_keywords = keyword_hits["found_non_business"]
         return False, (
             f"Document contains excessive non-business content. "
             f"Found {non_business_count} non-business indicators vs {financial_keyword_count} business terms: {', '.join(found_keywords[:3])}... "
@@ -579,12 +668,13 @@ If uncertain, default to ACCEPTING the document.
         return {"is_deal_document": True, "reason": "LLM validation unavailable, defaulting to accept", "confidence": 0.6}
 
 
-def check_document_quality(text: str) -> Tuple[bool, str]:
+def check_document_quality(text: str, keyword_hits: dict[str, Any] | None = None) -> Tuple[bool, str]:
     """
     Check document quality and provide warnings with strict business content validation.
     
     Args:
         text: Document text
+        keyword_hits: Result of `scan_keywords`, if the caller already has it
         
     Returns:
         Tuple of (is_acceptable: bool, warning_message: str)
@@ -599,22 +689,18 @@ def check_document_quality(text: str) -> Tuple[bool, str]:
         )
     
     # Check for excessive whitespace (likely corrupted or image-based PDF)
-    whitespace_ratio = len(re.findall(r'\s+', text)) / len(text) if text else 0
+    whitespace_ratio = len(_WHITESPACE_RE.findall(text)) / len(text) if text else 0
     if whitespace_ratio > 0.5:
         return False, (
             "Document appears to be corrupted or image-based PDF with minimal extractable text. "
             "Please ensure the PDF contains selectable text, not just images."
         )
     
-    text_lower = text.lower()
+    if keyword_hits is None:
+        keyword_hits = scan_keywords(text.lower())
     
     # STRICT check for financial indicators
-    financial_indicators = [
-        "pricing", "valuation", "deal", "contract", "agreement", "financial",
-        "investment", "acquisition", "merger", "equity", "revenue", "transaction",
-        "business", "company", "corporation", "enterprise"
-    ]
-    found_indicators = sum(1 for indicator in financial_indicators if indicator in text_lower)
+    found_indicators = keyword_hits["financial_indicators"]
     
     if found_indicators < 1:  # Reduced to 1 for more lenient validation
         return False, (
@@ -624,12 +710,12 @@ def check_document_quality(text: str) -> Tuple[bool, str]:
         )
     
     # Check for non-business content (lenient - only reject if significantly more non-business than business)
-    non_business_count = sum(1 for keyword in NON_BUSINESS_KEYWORDS if keyword in text_lower)
-    financial_keyword_count = sum(1 for keyword in FINANCIAL_KEYWORDS if keyword in text_lower)
+    non_business_count = keyword_hits["non_business"]
+    financial_keyword_count = keyword_hits["financial"]
     
     # Only reject if non-business keywords significantly outweigh business keywords
     if non_business_count > MAX_NON_BUSINESS_KEYWORDS and non_business_count > financial_keyword_count * 2:
-        found_keywords = [kw for kw in NON_BUSINESS_KEYWORDS if kw in text_lower]
+        found_keywords = keyword_hits["found_non_business"]
         return False, (
             f"Document contains excessive non-business content. "
             f"Found {non_business_count} non-business indicators vs {financial_keyword_count} business terms: {', '.join(found_keywords[:3])}... "
@@ -662,23 +748,28 @@ def handle_invalid_document(error_message: str) -> dict[str, Any]:
     }
 
 
-def process_valid_document(text: str, page_count: int) -> Tuple[bool, str]:
+def process_valid_document(
+    text: str, page_count: int, keyword_hits: dict[str, Any] | None = None
+) -> Tuple[bool, str]:
     """
     Final validation check before processing.
     
     Args:
         text: Extracted text
         page_count: Number of pages/sections
+        keyword_hits: Result of `scan_keywords`, if the caller already has it
         
     Returns:
         Tuple of (is_valid: bool, error_message: str)
     """
-    # Run all validation checks
-    is_quality_ok, quality_msg = check_document_quality(text)
+    # Run all validation checks, scanning the text once for both
+    if keyword_hits is None:
+        keyword_hits = scan_keywords(text.lower())
+    is_quality_ok, quality_msg = check_document_quality(text, keyword_hits)
     if not is_quality_ok:
         return False, quality_msg
     
-    is_financial, financial_msg = validate_financial_document(text, page_count)
+    is_financial, financial_msg, _ = validate_financial_document(text, page_count, keyword_hits)
     if not is_financial:
         return False, financial_msg
     
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+from threading import Lock
 from typing import Any, Dict
 
 import google.generativeai as genai
+from cachetools import LRUCache
 
 from core.config import get_settings
 
@@ -53,12 +56,14 @@ except Exception:
 # Fallback to a known free-tier model
 DEFAULT_MODEL = _available_model or "gemini-1.5-flash"
 
+# Response text keyed by (model, prompt) digest. Raw text is cached rather than the
+# parsed dict because callers mutate the result; each hit is re-parsed.
+_response_cache: LRUCache = LRUCache(maxsize=max(1, _settings.llm_cache_size))
+_response_cache_lock = Lock()
 
-def generate_json(prompt: str, model: str | None = None) -> Dict[str, Any]:
-    """Call Gemini with a prompt and try to parse JSON from the response text.
-    
-    Only uses free-tier models. Experimental models (with -exp or 2.5) are rejected.
-    """
+
+def _resolve_model_name(model: str | None) -> str:
+    """Map a requested model onto an allowed free-tier model name with 'models/' prefix."""
     
     # Always use free-tier model - reject experimental models even if passed
     if model:
@@ -81,25 +86,99 @@ def generate_json(prompt: str, model: str | None = None) -> Dict[str, Any]:
     # Ensure model name has 'models/' prefix if not present
     if not model_name.startswith("models/"):
         model_name = f"models/{model_name}"
+    return model_name
+
+
+def _cache_key(model_name: str, prompt: str, system_instruction: str | None = None) -> bytes:
+    digest = hashlib.sha256(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    if system_instruction:
+        digest.update(b"\0")
+        digest.update(system_instruction.encode("utf-8"))
+    return digest.digest()[:16]
+
+
+def _cached_text(key: bytes) -> str | None:
+    if not _settings.llm_cache_enabled:
+        return None
+    with _response_cache_lock:
+        return _response_cache.get(key)
+
+
+def _parse_text(text: str, key: bytes | None = None) -> Dict[str, Any]:
+    try:
+        result = json.loads(text)
+    except Exception:
+        # Fall back to returning raw text so the UI can still show something.
+        return {"raw": text, "parse_error": "Response was not valid JSON"}
+    # Only well-formed responses are worth replaying
+    if key is not None and _settings.llm_cache_enabled:
+        with _response_cache_lock:
+            _response_cache[key] = text
+    return result
+
+
+def _quota_error(model_name: str, error: Exception) -> RuntimeError | None:
+    error_msg = str(error)
+    if "quota" in error_msg.lower() or "429" in error_msg or "ResourceExhausted" in error_msg:
+        return RuntimeError(
+            f"Google API quota exceeded for model {model_name}. "
+            f"Please check your quota at https://ai.dev/usage?tab=rate-limit "
+            f"or wait for quota reset. Error: {error_msg[:200]}"
+        )
+    return None
+
+
+def generate_json(
+    prompt: str, model: str | None = None, system_instruction: str | None = None
+) -> Dict[str, Any]:
+    """Call Gemini with a prompt and try to parse JSON from the response text.
+    
+    Only uses free-tier models. Experimental models (with -exp or 2.5) are rejected.
+    Valid JSON responses are cached in memory by (model, prompt) digest; disable with
+    LLM_CACHE_ENABLED=false.
+    
+    `system_instruction` carries static instructions shared across calls. It is sent
+    ahead of the prompt, so repeated calls share an identical prefix that the provider
+    can serve from its prompt cache.
+    """
+    model_name = _resolve_model_name(model)
+    key = _cache_key(model_name, prompt, system_instruction)
+    cached = _cached_text(key)
+    if cached is not None:
+        return json.loads(cached)
     
     try:
-        gm = genai.GenerativeModel(model_name)
+        gm = genai.GenerativeModel(model_name, system_instruction=system_instruction)
         response = gm.generate_content(prompt)
-        text = getattr(response, "text", None) or ""
-
-        try:
-            return json.loads(text)
-        except Exception:
-            # Fall back to returning raw text so the UI can still show something.
-            return {"raw": text, "parse_error": "Response was not valid JSON"}
+        return _parse_text(getattr(response, "text", None) or "", key)
     except Exception as e:
-        error_msg = str(e)
-        if "quota" in error_msg.lower() or "429" in error_msg or "ResourceExhausted" in error_msg:
-            raise RuntimeError(
-                f"Google API quota exceeded for model {model_name}. "
-                f"Please check your quota at https://ai.dev/usage?tab=rate-limit "
-                f"or wait for quota reset. Error: {error_msg[:200]}"
-            ) from e
+        quota_error = _quota_error(model_name, e)
+        if quota_error is not None:
+            raise quota_error from e
         raise
 
 
+async def generate_json_async(
+    prompt: str, model: str | None = None, system_instruction: str | None = None
+) -> Dict[str, Any]:
+    """Async variant of `generate_json` so independent LLM calls can overlap.
+    
+    Uses the client's native `generate_content_async`; same model rules, cache and error handling.
+    """
+    model_name = _resolve_model_name(model)
+    key = _cache_key(model_name, prompt, system_instruction)
+    cached = _cached_text(key)
+    if cached is not None:
+        return json.loads(cached)
+    
+    try:
+        gm = genai.GenerativeModel(model_name, system_instruction=system_instruction)
+        response = await gm.generate_content_async(prompt)
+        return _parse_text(getattr(response, "text", None) or "", key)
+    except Exception as e:
+        quota_error = _quota_error(model_name, e)
+        if quota_error is not None:
+            raise quota_error from e
+        raise
@@ -71,15 +71,14 @@ class EmbeddingService:
         Returns:
             List of embedding vectors
         """
-        vectors: List[List[float]] = []
-        for doc in documents:
-            cached = self._maybe_cached(doc)
-            if cached is not None:
-                vectors.append(cached)
-                continue
-            vector = self.model.embed_query(doc)
-            self._store_cache(doc, vector)
-            vectors.append(vector)
+        documents = list(documents)
+        vectors: List[List[float] | None] = [self._maybe_cached(doc) for doc in documents]
+        # Embed each distinct uncached text once, in one model call, and cache them together
+        missing = list(dict.fromkeys(doc for doc, vector in zip(documents, vectors) if vector is None))
+        if missing:
+            computed = dict(zip(missing, self.model.embed_documents(missing)))
+            self.cache.set_many(computed.items())
+            vectors = [computed[doc] if vector is None else vector for doc, vector in zip(documents, vectors)]
         return vectors
 
     def embed_query(self, text: str) -> List[float]:
@@ -0,0 +1,41 @@
+"""
+Dependency-free hashing embedder.
+
+Used where a real sentence-transformer is unavailable or too heavy (e.g. ranking
+historical deals inside an agent constructed without an EmbeddingService). Exposes
+the same embed_documents / embed_query interface as EmbeddingService.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Iterable, List
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """Signed feature-hashing of lowercase word tokens into a fixed-size, L2-normalized vector."""
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = dim
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = zlib.crc32(token.encode("utf-8"))
+            vector[digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector
+
+    def embed_documents(self, documents: Iterable[str]) -> List[List[float]]:
+        return [self._vector(doc).tolist() for doc in documents]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text).tolist()
@@ -0,0 +1,90 @@
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core.cache import EmbeddingCache, LLMCache, SemanticCache
+
+
+class EmbeddingCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+
+    def test_round_trip(self):
+        cache = EmbeddingCache(self.dir / "cache.sqlite3")
+        cache.set("text", [1.0, 2.5])
+        cache.flush()
+        self.assertEqual(EmbeddingCache(self.dir / "cache.sqlite3").get("text"), [1.0, 2.5])
+
+    def test_legacy_pickle_path_is_replaced(self):
+        path = self.dir / "embedding_cache.pkl"
+        path.write_bytes(pickle.dumps({"hash": [0.1, 0.2]}))
+        cache = EmbeddingCache(path)
+        cache.set("text", [3.0])
+        self.assertEqual(cache.get("text"), [3.0])
+        self.assertTrue((self.dir / "embedding_cache.pkl.legacy").exists())
+
+
+class LLMCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("core.cache.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = LLMCache(maxsize=8, default_ttl=60)
+
+    def test_entries_expire_after_their_ttl(self):
+        self.cache.set("default", {"a": 1})
+        self.cache.set("short", {"b": 2}, ttl=5)
+        self.now += 5
+        self.assertIsNone(self.cache.get("short"))
+        self.assertEqual(self.cache.get("default"), {"a": 1})
+        self.now += 55
+        self.assertIsNone(self.cache.get("default"))
+
+    def test_get_returns_a_fresh_object(self):
+        self.cache.set("key", {"items": [1, 2]})
+        first = self.cache.get("key")
+        first["items"].append(3)
+        self.assertEqual(self.cache.get("key"), {"items": [1, 2]})
+        self.assertIsNot(self.cache.get("key"), self.cache.get("key"))
+
+    def test_recorded_failure_masks_the_key_until_the_error_ttl_passes(self):
+        self.cache.set_error("key")
+        self.assertTrue(self.cache.failed("key"))
+        self.assertIsNone(self.cache.get("key"))
+        self.now += self.cache.error_ttl[0] - 1
+        self.assertTrue(self.cache.failed("key"))
+        self.now += self.cache.error_ttl[1]
+        self.assertFalse(self.cache.failed("key"))
+
+    def test_value_replaces_a_recorded_failure(self):
+        self.cache.set_error("key", ttl=30)
+        self.cache.set("key", {"ok": True})
+        self.assertFalse(self.cache.failed("key"))
+        self.assertEqual(self.cache.get("key"), {"ok": True})
+        self.assertFalse(self.cache.failed("missing"))
+
+
+class SemanticCacheTest(unittest.TestCase):
+    def test_lookup_respects_threshold_and_skeleton(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.add("skeleton", [1.0, 0.0], {"answer": 1}, {"competitor": "Acme"})
+        self.assertEqual(cache.lookup("skeleton", [2.0, 0.1]), ({"answer": 1}, {"competitor": "Acme"}))
+        self.assertIsNone(cache.lookup("skeleton", [1.0, 1.0]))  # cosine ~0.71
+        self.assertIsNone(cache.lookup("other", [1.0, 0.0]))
+
+    def test_oldest_entry_is_evicted_first(self):
+        cache = SemanticCache(threshold=0.99, maxsize=2)
+        for index, vector in enumerate(([1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])):
+            cache.add("skeleton", vector, index)
+        self.assertIsNone(cache.lookup("skeleton", [1.0, 0.0, 0.0]))
+        self.assertEqual(cache.lookup("skeleton", [0.0, 1.0, 0.0]), (1, {}))
+        self.assertEqual(cache.lookup("skeleton", [0.0, 0.0, 1.0]), (2, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
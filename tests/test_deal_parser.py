@@ -0,0 +1,62 @@
+import random
+import re
+import unittest
+
+from core.deal_parser import (
+    _OWNER_LABELS,
+    _OWNER_NAME,
+    _OWNER_SCANNER,
+    _VALUE_PATTERN_SOURCES,
+    _VALUE_SCANNER,
+    _first_by_priority,
+    infer_metadata,
+)
+
+_FRAGMENTS = (
+    "$1.5 million", "$250,000", "$,", "deal value: 400,000", "Value $90", "2 M", "3.5m",
+    "owner: Jane Doe", "Sales Rep Alan", "rep: bob", "account manager: Priya Nair",
+    "the client", "budget", "\n", " ", ":", "12",
+)
+
+
+def _sequential(patterns, text):
+    """Reference behaviour: search with each pattern in priority order, first hit wins."""
+    for index, pattern in enumerate(patterns):
+        match = pattern.search(text)
+        if match:
+            return index, match.group(0)
+    return None
+
+
+class InferMetadataIndustryTest(unittest.TestCase):
+    def test_detects_industry_case_insensitively(self):
+        self.assertEqual(infer_metadata("Leading SaaS vendor").industry, "Technology")
+
+    def test_non_ascii_case_folds_are_not_keywords(self):
+        # re.IGNORECASE matches these against ASCII keywords; str.lower() does not
+        for text in ("FİNANCE", "DİGİTAL", "ſaas vendor", "fınance"):
+            with self.subTest(text=text):
+                self.assertEqual(infer_metadata(text).industry, "General")
+
+
+class PriorityScannerTest(unittest.TestCase):
+    def _assert_equivalent(self, scanner, sources):
+        patterns = [re.compile(source, re.IGNORECASE) for source in sources]
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = "".join(rng.choice(_FRAGMENTS) for _ in range(rng.randint(0, 8)))
+            first = _first_by_priority(scanner, text)
+            found = None if first is None else (first[0], first[1].group(f"p{first[0]}"))
+            with self.subTest(text=text):
+                self.assertEqual(found, _sequential(patterns, text))
+
+    def test_value_scanner_matches_sequential_search(self):
+        self._assert_equivalent(_VALUE_SCANNER, _VALUE_PATTERN_SOURCES)
+
+    def test_owner_scanner_matches_sequential_search(self):
+        sources = [f"{re.escape(label)}[:\\s]+(?P<n{i}>{_OWNER_NAME})" for i, label in enumerate(_OWNER_LABELS)]
+        self._assert_equivalent(_OWNER_SCANNER, sources)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+from agents.playbook_agent import PlaybookAgent, Recommendation, _action_key, _dedupe_cap
+from core.cache import SemanticCache
+
+_DEAL = (
+    "Acme Corp evaluated our analytics platform for six months with weekly calls between the "
+    "sales team, procurement and the data engineering leads. The champion left in the final "
+    "month and the deal was lost because of a {reason}."
+)
+
+
+class DedupeRecommendationsTest(unittest.TestCase):
+    def test_actions_compare_case_and_whitespace_insensitively(self):
+        items = [
+            {"action": "Send written summary"},
+            Recommendation("High", "send  WRITTEN summary", 8, "Sales Rep"),
+            "Send written summary ",
+        ]
+        self.assertEqual(_dedupe_cap(items, 12, _action_key), items[:1])
+
+    def test_unhashable_items_do_not_raise(self):
+        items = [{"action": ["a", "b"]}, ["stray"], {"action": {"nested": 1}}, "Call the buyer"]
+        self.assertEqual(_dedupe_cap(items, 12, _action_key), items)
+
+    def test_finalize_drops_malformed_recommendations(self):
+        result = {"recommendations": [["stray"], {"action": ["a"]}, {"action": "Call the buyer", "impact": 7}]}
+        playbook = PlaybookAgent()._finalize(result, {}, {}, "")
+        recommendations = playbook["recommendations"]
+        self.assertTrue(all(type(rec) is dict for rec in recommendations))
+        self.assertIn("Call the buyer", [rec["action"] for rec in recommendations])
+
+
+class SemanticCacheKeyTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("agents.playbook_agent._semantic_cache", SemanticCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.agent = PlaybookAgent()
+
+    def _generate(self, reason):
+        document = _DEAL.format(reason=reason)
+        with mock.patch("agents.playbook_agent.generate_json", return_value={"what_went_wrong": [reason]}) as llm:
+            result = self.agent._semantic_or_generate("", {}, {}, document)
+        return result, llm.call_count
+
+    def test_same_loss_drivers_reuse_the_cached_playbook(self):
+        self._generate("pricing gap")
+        result, calls = self._generate("pricing gap ")
+        self.assertEqual(calls, 0)
+        self.assertEqual(result, {"what_went_wrong": ["pricing gap"]})
+
+    def test_different_loss_reason_misses_the_cache(self):
+        self._generate("pricing gap")
+        result, calls = self._generate("delivery delay")
+        self.assertEqual(calls, 1)
+        self.assertEqual(result, {"what_went_wrong": ["delivery delay"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,7 +17,7 @@ Generates comprehensive business reports with:
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
 from fpdf import FPDF
@@ -494,10 +494,7 @@ class ReportBuilder:
 
     def _generate_inferred_timeline(self) -> List[Dict[str, Any]]:
         """Generate inferred timeline events."""
-        from datetime import datetime, timedelta
-        from dateutil.relativedelta import relativedelta
-        
-        base_date = datetime.now() - relativedelta(months=4)
+        base_date = datetime.now() - timedelta(days=120)  # ~4 months ago
         events = []
         
         phase_dates = {